@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import io
 import os
 from pathlib import Path
 from typing import Optional
@@ -24,19 +25,26 @@ if not LOGO_URL:
     LOGO_URL = None
 
 
-def logo_embed_url() -> Optional[str]:
-    if LOGO_PATH and LOGO_ATTACHMENT_NAME:
-        return f"attachment://{LOGO_ATTACHMENT_NAME}"
-    if LOGO_URL:
-        return LOGO_URL
-    return None
+# Resolved once at import: the logo bytes are reused for every attachment.
+_LOGO_BYTES: Optional[bytes] = None
+if LOGO_PATH and LOGO_ATTACHMENT_NAME:
+    try:
+        _LOGO_BYTES = LOGO_PATH.read_bytes()
+    except OSError:
+        LOGO_PATH = None
 
+if LOGO_PATH and LOGO_ATTACHMENT_NAME:
+    _LOGO_EMBED_URL: Optional[str] = f"attachment://{LOGO_ATTACHMENT_NAME}"
+else:
+    _LOGO_EMBED_URL = LOGO_URL
 
-def logo_requires_attachment() -> bool:
-    return LOGO_PATH is not None and LOGO_ATTACHMENT_NAME is not None
+
+def logo_embed_url() -> Optional[str]:
+    return _LOGO_EMBED_URL
 
 
 def build_logo_file() -> Optional[discord.File]:
-    if LOGO_PATH and LOGO_ATTACHMENT_NAME:
-        return discord.File(LOGO_PATH, filename=LOGO_ATTACHMENT_NAME)
+    # discord.File is single-use, so wrap the cached bytes in a fresh buffer per send.
+    if _LOGO_BYTES is not None:
+        return discord.File(io.BytesIO(_LOGO_BYTES), filename=LOGO_ATTACHMENT_NAME)
     return None
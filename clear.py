@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+from datetime import datetime, timedelta, timezone
+
 from discord import app_commands, Interaction
 from discord.ext import commands
 
+# Discord refuses bulk deletes for messages older than 14 days; keep a small safety margin.
+BULK_DELETE_MAX_AGE = timedelta(days=14, minutes=-5)
+
 class Clear(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
@@ -19,7 +24,14 @@ class Clear(commands.Cog):
         if channel is None:
             return await interaction.followup.send("No channel found.", ephemeral=True)
         try:
-            deleted = await channel.purge(limit=amount)
+            msgs = [m async for m in channel.history(limit=amount)]
+            cutoff = datetime.now(timezone.utc) - BULK_DELETE_MAX_AGE
+            if any(m.created_at < cutoff for m in msgs):
+                deleted = await channel.purge(limit=amount)
+            else:
+                for i in range(0, len(msgs), 100):
+                    await channel.delete_messages(msgs[i:i + 100])
+                deleted = msgs
         except Exception as exc:
             return await interaction.followup.send(f"Failed to clear messages: {exc}", ephemeral=True)
         await interaction.followup.send(f"Cleared {len(deleted)} messages.", ephemeral=True)
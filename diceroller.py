@@ -6,7 +6,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-DICE_RE = re.compile(r"^\s*(\d+)[dD](\d+)(?:\+(\d+))?\s*$")
+DICE_RE = re.compile(r"\s*(?P<x>\d+)[dD](?P<y>\d+)(?:\+(?P<z>\d+))?\s*")
 
 class DiceRoller(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -14,15 +14,15 @@ class DiceRoller(commands.Cog):
 
     @app_commands.command(name="roll", description="Roll dice: XdY or XdY+Z (e.g., 2d6+3)")
     async def roll(self, interaction: discord.Interaction, notation: str):
-        m = DICE_RE.match(notation)
+        m = DICE_RE.fullmatch(notation)
         if not m:
             return await interaction.response.send_message(
                 "Use format `XdY` or `XdY+Z`, e.g. `2d6+1`.", ephemeral=True
             )
-        x, y, z = int(m.group(1)), int(m.group(2)), int(m.group(3) or 0)
+        x, y, z = int(m["x"]), int(m["y"]), int(m["z"] or 0)
         if x <= 0 or y <= 0 or x > 100 or y > 1000:
             return await interaction.response.send_message("Dice out of bounds.", ephemeral=True)
-        rolls = [random.randint(1, y) for _ in range(x)]
+        rolls = random.choices(range(1, y + 1), k=x)
         total = sum(rolls) + z
         detail = " + ".join(map(str, rolls)) + (f" + {z}" if z else "")
         await interaction.response.send_message(f"🎲 {notation} = **{total}** ({detail})")
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import hashlib
 import logging
 import os
+import tempfile
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Optional
 
 import discord
+import orjson
 from discord.ext import commands
 
 # === Logging Setup ===
@@ -25,23 +27,27 @@ if not p.exists():
         f"Config file '{CFG_PATH}' not found. Create it from 'config.json.example'."
     )
 
-config_raw = p.read_text(encoding="utf-8")
 try:
-    config: dict = json.loads(config_raw)
-except json.JSONDecodeError as e:
+    config: dict = orjson.loads(p.read_bytes())
+except orjson.JSONDecodeError as e:
     raise ValueError(f"config.json is not valid JSON: {e}") from e
 
 if not isinstance(config, dict):
     raise ValueError("config.json must contain a top-level JSON object.")
 
-# Optionally mirror config values to env for legacy code (no Riot keys anymore)
+# Cogs read their knobs from env at import; mirror only those key families (never the token).
+ENV_MIRROR_PREFIXES: tuple[str, ...] = ("BOT_LOGO_", "FFMPEG_", "LLM_", "MUSIC_", "SPOTIFY_", "YT")
 for k, v in config.items():
-    if v is not None:
-        os.environ[str(k)] = str(v)
+    if v is not None and k.startswith(ENV_MIRROR_PREFIXES):
+        os.environ[k] = v if isinstance(v, str) else orjson.dumps(v).decode()
+
+for key in ("DISCORD_TOKEN", "PREFIX"):
+    if not isinstance(config.get(key, ""), str):
+        raise ValueError(f"config.json: {key} must be a string.")
 
 # === Bot Setup ===
-TOKEN = str(config.get("DISCORD_TOKEN", "")).strip()
-PREFIX = str(config.get("PREFIX", ".")).strip() or "."
+TOKEN = config.get("DISCORD_TOKEN", "").strip()
+PREFIX = config.get("PREFIX", ".").strip() or "."
 if not TOKEN:
     raise RuntimeError("DISCORD_TOKEN missing in config.json")
 
@@ -52,17 +58,58 @@ intents.members = False  # flip to True if any cog needs member events
 
 DEFAULT_EXTENSIONS: tuple[str, ...] = ("music", "clear", "diceroller", "meme")
 
+# Last synced app-command shape; an unchanged tree skips the global sync on boot
+# Defaults to the temp dir: the app directory isn't writable for the container's non-root user.
+CMDTREE_SIG_PATH = Path(os.getenv("CMDTREE_SIG_PATH", os.path.join(tempfile.gettempdir(), "discbot.cmdtree.sig")))
+
+
+def command_tree_signature(tree: discord.app_commands.CommandTree) -> str:
+    # Hash the same payload tree.sync() uploads for global commands, so any field Discord sees counts.
+    payload = sorted(
+        (c.to_dict(tree) for c in tree.get_commands()),
+        key=lambda d: (d.get("type", 1), d["name"]),
+    )
+    return hashlib.sha1(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+_SYNC_LOCK = asyncio.Lock()  # boot sync and .sync never run side by side
+
+
+async def sync_tree(bot: commands.Bot, *, force: bool = False) -> bool:
+    """Sync app commands when their shape differs from the last recorded sync (or always, with force)."""
+    async with _SYNC_LOCK:
+        sig = command_tree_signature(bot.tree)
+        if not force:
+            try:
+                if CMDTREE_SIG_PATH.read_text().strip() == sig:
+                    return False
+            except OSError:
+                pass
+        await bot.tree.sync()
+        try:
+            CMDTREE_SIG_PATH.write_text(sig)
+        except OSError as e:
+            log.warning("Could not record command tree signature at %s: %s", CMDTREE_SIG_PATH, e)
+        return True
+
 
 class JakobyBot(commands.Bot):
     def __init__(self, *, extensions: Iterable[str], **kwargs):
         super().__init__(**kwargs)
         self._initial_extensions = tuple(extensions)
+        self._sync_task: Optional[asyncio.Task] = None
 
     async def setup_hook(self):
         await load_extensions(self, self._initial_extensions)
+        # Every extension is in the tree by now; sync in the background so login isn't held up.
+        self._sync_task = asyncio.create_task(self._background_sync())
+
+    async def _background_sync(self):
         try:
-            await self.tree.sync()
-            log.info("Application commands synced.")
+            if await sync_tree(self):
+                log.info("Application commands synced.")
+            else:
+                log.info("Application commands unchanged; skipped sync.")
         except Exception:
             log.exception("Failed to sync application commands.")
 
@@ -73,18 +120,27 @@ bot = JakobyBot(command_prefix=PREFIX, intents=intents, help_command=None, exten
 setattr(bot, "config", {k: v for k, v in config.items() if k not in {"RIOT_API_KEY", "RIOT_DEFAULT_PLATFORM"}})
 
 
+@bot.command(name="sync", hidden=True)
+@commands.is_owner()
+async def sync_commands(ctx: commands.Context):
+    """Owner-only: push the app command tree to Discord regardless of the stored signature."""
+    await sync_tree(bot, force=True)
+    await ctx.reply("Application commands synced.", mention_author=False)
+
+
 @bot.event
 async def on_ready():
     log.info("Logged in as %s (%s)", bot.user, getattr(bot.user, "id", "unknown"))
 
 
 async def load_extensions(bot: commands.Bot, exts: Iterable[str]):
-    for ext in exts:
-        try:
-            await bot.load_extension(ext)
+    exts = tuple(exts)
+    results = await asyncio.gather(*(bot.load_extension(ext) for ext in exts), return_exceptions=True)
+    for ext, result in zip(exts, results):
+        if isinstance(result, BaseException):
+            log.error("Failed to load extension: %s", ext, exc_info=result)
+        else:
             log.info("Loaded extension: %s", ext)
-        except Exception:
-            log.exception("Failed to load extension: %s", ext)
 
 
 @bot.event
@@ -2,12 +2,15 @@ from __future__ import annotations
 
 import asyncio
 import os
+import random
 import time
+from collections import deque
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Deque, Optional
 
 import aiohttp
 import discord
+import orjson
 from discord import app_commands
 from discord.ext import commands
 
@@ -17,15 +20,67 @@ LLM_BASE_URL = (os.getenv("LLM_BASE_URL") or "http://ollama.llm.svc.cluster.loca
 LLM_MODEL = os.getenv("LLM_MODEL", "llama3.2:1b")
 LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT_SECONDS", "180"))
 LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "200"))
+LLM_PROBE_TIMEOUT = aiohttp.ClientTimeout(total=5)
+LLM_WAKE_SECONDS = float(os.getenv("LLM_WAKE_SECONDS", "3"))  # keeps /llmstatus near its old ~3s worst case
+LLM_REPLY_CAP = 1900  # characters kept for a Discord message
+
+# Response caching: recycle recent jokes now and then, keep roasts briefly per target+dossier.
+JOKE_CACHE_SIZE = int(os.getenv("LLM_JOKE_CACHE_SIZE", "32"))
+JOKE_REUSE_CHANCE = float(os.getenv("LLM_JOKE_REUSE_CHANCE", "0.4"))
+JOKE_POOL_TARGET = int(os.getenv("LLM_JOKE_POOL_TARGET", "4"))
+JOKE_WARM_SECONDS = float(os.getenv("LLM_JOKE_WARM_SECONDS", "300"))  # 0 disables the background warmer
+BULLY_CACHE_TTL = float(os.getenv("LLM_BULLY_CACHE_TTL", "120"))
+
+JOKE_SYSTEM_PROMPT = (
+    "You host a mischievous late-night satire show that loves teasing red tape, budget hearings, and bureaucratic chaos."
+    " Your humor is clever, PG-13, and feels like insider banter between civic hackers—never hateful or violent."
+    " When asked for a joke, you always deliver a fresh quip instead of refusing."
+)
+JOKE_USER_PROMPT = (
+    "Tell one original joke about bloated bureaucracy, paperwork, or surveillance theater."
+    " Keep it witty, lighthearted, and short enough to fit in a Discord message."
+)
+
+
+def _orjson_dumps(obj) -> str:
+    # aiohttp expects a str-returning serializer; orjson emits bytes.
+    return orjson.dumps(obj).decode()
+
 
 class Meme(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self._llm_metrics_lock = asyncio.Lock()
         self._llm_inflight = 0
         self._llm_last_latency: Optional[float] = None
         self._llm_last_success: Optional[datetime] = None
         self._llm_last_error: Optional[str] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._joke_cache: Deque[str] = deque(maxlen=max(1, JOKE_CACHE_SIZE))
+        self._bully_cache: dict[int, tuple[float, str]] = {}
+        self._joke_warmer_task: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        self._http()
+        if JOKE_WARM_SECONDS > 0 and JOKE_POOL_TARGET > 0:
+            self._joke_warmer_task = asyncio.create_task(self._joke_warmer())
+
+    async def cog_unload(self):
+        if self._joke_warmer_task and not self._joke_warmer_task.done():
+            self._joke_warmer_task.cancel()
+        self._joke_warmer_task = None
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _http(self) -> aiohttp.ClientSession:
+        # One pooled session per cog so repeated LLM calls reuse keep-alive connections.
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=LLM_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit=16, ttl_dns_cache=300, keepalive_timeout=60),
+                json_serialize=_orjson_dumps,
+            )
+        return self._session
 
     def _profile_snapshot(self, member: Optional[discord.Member], user: discord.abc.User) -> str:
         display = user.display_name
@@ -36,11 +91,19 @@ class Meme(commands.Cog):
             if member.joined_at:
                 days = (datetime.now(timezone.utc) - member.joined_at).days
                 parts.append(f"in server for {days} days")
-            role_names = [r.name for r in getattr(member, "roles", []) if getattr(r, "name", "@everyone") != "@everyone"]
+            role_names: list[str] = []
+            seen: set[str] = set()
+            for r in getattr(member, "roles", []):
+                name = getattr(r, "name", "@everyone")
+                if name != "@everyone" and name not in seen:
+                    seen.add(name)
+                    role_names.append(name)
+                    if len(role_names) == 5:
+                        break
             if role_names:
-                parts.append(f"roles: {', '.join(role_names[:5])}")
+                parts.append(f"roles: {', '.join(role_names)}")
             top_role = getattr(member, "top_role", None)
-            if top_role and top_role.name not in ("@everyone",) and top_role.name not in role_names[:5]:
+            if top_role and top_role.name != "@everyone" and top_role.name not in seen:
                 parts.append(f"notable rank: {top_role.name}")
         return "; ".join(parts)
 
@@ -48,7 +111,7 @@ class Meme(commands.Cog):
         if not LLM_BASE_URL or not LLM_MODEL:
             return None
 
-        await self._change_inflight(1)
+        self._change_inflight(1)
         start = time.perf_counter()
 
         payload = {
@@ -57,36 +120,45 @@ class Meme(commands.Cog):
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
-            "stream": False,
+            "stream": True,
             "options": {"temperature": temperature, "num_predict": LLM_MAX_TOKENS},
         }
 
-        timeout = aiohttp.ClientTimeout(total=LLM_TIMEOUT)
+        pieces: list[str] = []
+        received = 0
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(f"{LLM_BASE_URL}/api/chat", json=payload) as resp:
-                    if resp.status != 200:
-                        await self._record_llm_error(f"HTTP {resp.status}")
-                        await self._change_inflight(-1)
-                        return None
-                    data = await resp.json()
+            async with self._http().post(f"{LLM_BASE_URL}/api/chat", json=payload) as resp:
+                if resp.status != 200:
+                    self._record_llm_error(f"HTTP {resp.status}")
+                    self._change_inflight(-1)
+                    return None
+                # Ollama streams one JSON object per line; stop once we hold more than Discord will show.
+                async for raw in resp.content:
+                    if not raw.strip():
+                        continue
+                    chunk = orjson.loads(raw)
+                    message = chunk.get("message")
+                    piece = (message.get("content") if isinstance(message, dict) else chunk.get("response")) or ""
+                    pieces.append(piece)
+                    received += len(piece)
+                    if chunk.get("done"):
+                        break
+                    if received >= LLM_REPLY_CAP:
+                        # Dropping the connection tells Ollama to stop generating.
+                        resp.close()
+                        break
         except Exception as exc:
-            await self._record_llm_error(str(exc))
-            await self._change_inflight(-1)
+            self._record_llm_error(str(exc))
+            self._change_inflight(-1)
             return None
-        await self._change_inflight(-1)
-
-        message = data.get("message")
-        if isinstance(message, dict):
-            content = message.get("content") or ""
-            await self._record_llm_success(time.perf_counter() - start)
-            return content.strip()
-        content = data.get("response") or ""
+        self._change_inflight(-1)
+
+        content = "".join(pieces).strip()
         if content:
-            await self._record_llm_success(time.perf_counter() - start)
+            self._record_llm_success(time.perf_counter() - start)
         else:
-            await self._record_llm_error("Empty response")
-        return content.strip() or None
+            self._record_llm_error("Empty response")
+        return content or None
 
     async def _reply_llm_error(self, interaction: discord.Interaction):
         message = "LLM service is offline. Set LLM_BASE_URL/LLM_MODEL env vars and restart the bot."
@@ -102,21 +174,16 @@ class Meme(commands.Cog):
 
         await interaction.response.defer(thinking=True)
 
-        system_prompt = (
-            "You host a mischievous late-night satire show that loves teasing red tape, budget hearings, and bureaucratic chaos."
-            " Your humor is clever, PG-13, and feels like insider banter between civic hackers—never hateful or violent."
-            " When asked for a joke, you always deliver a fresh quip instead of refusing."
-        )
-        user_prompt = (
-            "Tell one original joke about bloated bureaucracy, paperwork, or surveillance theater."
-            " Keep it witty, lighthearted, and short enough to fit in a Discord message."
-        )
-        content = await self._run_llm_chat(system_prompt=system_prompt, user_prompt=user_prompt, temperature=0.9)
+        content: Optional[str]
+        if self._joke_cache and random.random() < JOKE_REUSE_CHANCE:
+            content = random.choice(self._joke_cache)
+        else:
+            content = await self._generate_joke()
         if not content:
             return await self._reply_llm_error(interaction)
 
-        if len(content) > 1900:
-            content = content[:1900] + "…"
+        if len(content) > LLM_REPLY_CAP:
+            content = content[:LLM_REPLY_CAP] + "…"
 
         await interaction.followup.send(content)
 
@@ -150,16 +217,47 @@ class Meme(commands.Cog):
             f" Thread in these dossier notes: {dossier}."
             " Stay affectionate, under four sentences, and focus on friendly rivalry—not hate or harm."
         )
-        content = await self._run_llm_chat(system_prompt=system_prompt, user_prompt=user_prompt, temperature=1.0)
+        cache_key = hash((target.id, dossier))
+        cached = self._bully_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < BULLY_CACHE_TTL:
+            content = cached[1]
+        else:
+            content = await self._run_llm_chat(system_prompt=system_prompt, user_prompt=user_prompt, temperature=1.0)
+            if content:
+                self._remember_roast(cache_key, content)
         if not content:
             return await self._reply_llm_error(interaction)
 
-        if len(content) > 1900:
-            content = content[:1900] + "…"
+        if len(content) > LLM_REPLY_CAP:
+            content = content[:LLM_REPLY_CAP] + "…"
 
         allowed = discord.AllowedMentions(users=[target])
         await interaction.followup.send(content, allowed_mentions=allowed)
 
+    async def _generate_joke(self) -> Optional[str]:
+        content = await self._run_llm_chat(
+            system_prompt=JOKE_SYSTEM_PROMPT, user_prompt=JOKE_USER_PROMPT, temperature=0.9
+        )
+        if content:
+            self._joke_cache.append(content)
+        return content
+
+    async def _joke_warmer(self):
+        """Keep a few jokes on hand so cache hits are possible right after startup."""
+        try:
+            while True:
+                if self._llm_inflight == 0 and len(self._joke_cache) < JOKE_POOL_TARGET:
+                    await self._generate_joke()
+                await asyncio.sleep(JOKE_WARM_SECONDS)
+        except asyncio.CancelledError:
+            pass
+
+    def _remember_roast(self, key: int, content: str):
+        now = time.monotonic()
+        for k in [k for k, (ts, _) in self._bully_cache.items() if now - ts >= BULLY_CACHE_TTL]:
+            del self._bully_cache[k]
+        self._bully_cache[key] = (now, content)
+
     @app_commands.command(name="llmstatus", description="Show the internal LLM status dashboard")
     async def llmstatus(self, interaction: discord.Interaction):
         await interaction.response.defer(thinking=True, ephemeral=True)
@@ -168,31 +266,29 @@ class Meme(commands.Cog):
         file = build_logo_file()
         await interaction.followup.send(embed=embed, ephemeral=True, file=file)
 
-    async def _change_inflight(self, delta: int):
-        async with self._llm_metrics_lock:
-            self._llm_inflight = max(0, self._llm_inflight + delta)
-
-    async def _record_llm_success(self, duration: float):
-        async with self._llm_metrics_lock:
-            self._llm_last_latency = duration
-            self._llm_last_success = datetime.now(timezone.utc)
-            self._llm_last_error = None
-
-    async def _record_llm_error(self, message: str):
-        async with self._llm_metrics_lock:
-            self._llm_last_error = message
-
-    async def _snapshot_metrics(self):
-        async with self._llm_metrics_lock:
-            return {
-                "inflight": self._llm_inflight,
-                "last_latency": self._llm_last_latency,
-                "last_success": self._llm_last_success,
-                "last_error": self._llm_last_error,
-            }
+    # Metrics are only touched from the event loop and never across an await,
+    # so plain attribute writes are already atomic here.
+    def _change_inflight(self, delta: int):
+        self._llm_inflight = max(0, self._llm_inflight + delta)
+
+    def _record_llm_success(self, duration: float):
+        self._llm_last_latency = duration
+        self._llm_last_success = datetime.now(timezone.utc)
+        self._llm_last_error = None
+
+    def _record_llm_error(self, message: str):
+        self._llm_last_error = message
+
+    def _snapshot_metrics(self):
+        return {
+            "inflight": self._llm_inflight,
+            "last_latency": self._llm_last_latency,
+            "last_success": self._llm_last_success,
+            "last_error": self._llm_last_error,
+        }
 
     async def _gather_llm_diagnostics(self) -> dict:
-        metrics = await self._snapshot_metrics()
+        metrics = self._snapshot_metrics()
         summary_lines: list[str] = []
         reachable = False
         tags: list[str] = []
@@ -201,13 +297,17 @@ class Meme(commands.Cog):
             summary_lines.append("❌ LLM_BASE_URL is not configured.")
             return {"reachable": False, "logs": summary_lines, "metrics": metrics, "models": []}
 
-        timeout = aiohttp.ClientTimeout(total=5)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            reachable = await self._ping_llm(session, summary_lines)
-            if not reachable:
-                await self._wake_llm(session, summary_lines)
-                reachable = await self._ping_llm(session, summary_lines, post_wake=True)
-
+        session = self._http()
+        # Speculatively fetch manifests alongside the ping; a healthy server answers both in one RTT.
+        tag_logs: list[str] = []
+        tags_task = asyncio.create_task(self._fetch_llm_models(session, tag_logs))
+        reachable = await self._ping_llm(session, summary_lines)
+        if reachable:
+            tags = await tags_task
+            summary_lines.extend(tag_logs)
+        else:
+            tags_task.cancel()
+            reachable = await self._wake_llm(session, summary_lines)
             if reachable:
                 tags = await self._fetch_llm_models(session, summary_lines)
 
@@ -219,7 +319,7 @@ class Meme(commands.Cog):
         if not post_wake:
             logs.append("📡 Hailing JakobyAI uplink…")
         try:
-            async with session.get(f"{LLM_BASE_URL}/") as resp:
+            async with session.head(f"{LLM_BASE_URL}/", timeout=LLM_PROBE_TIMEOUT) as resp:
                 if resp.status == 200:
                     logs.append("🟢 JakobyAI responded with a green heartbeat.")
                     return True
@@ -228,29 +328,51 @@ class Meme(commands.Cog):
             logs.append(f"⚠️ No answer: {exc}.")
         return False
 
-    async def _wake_llm(self, session: aiohttp.ClientSession, logs: list[str]):
+    async def _wake_llm(self, session: aiohttp.ClientSession, logs: list[str]) -> bool:
         logs.extend(
             [
                 "⚡ Dispatching a contraband WoL burst via the scav relay…",
-                "⏳ Waiting up to 20s for the contraband Ollama crate to boot…",
+                f"⏳ Waiting up to {LLM_WAKE_SECONDS:g}s for the contraband Ollama crate to boot…",
             ]
         )
-        await asyncio.sleep(2)
         try:
-            async with session.post(f"{LLM_BASE_URL}/api/ps") as resp:
+            async with session.post(f"{LLM_BASE_URL}/api/ps", timeout=LLM_PROBE_TIMEOUT) as resp:
                 if resp.status == 200:
                     logs.append("🧰 Supervisor acknowledged the spin-up request.")
                 else:
                     logs.append(f"⚠️ Supervisor refused with HTTP {resp.status}.")
         except Exception as exc:
             logs.append(f"⚠️ Could not reach supervisor: {exc}.")
-        await asyncio.sleep(1)
+
+        # Re-ping with backoff (0.25s doubling to 2s) until the server answers or the wake budget
+        # runs out; each ping is cut off at the deadline too. Keep only the last attempt's logs.
+        deadline = time.monotonic() + LLM_WAKE_SECONDS
+        delay = 0.25
+        while True:
+            attempt_logs: list[str] = []
+            try:
+                up = await asyncio.wait_for(
+                    self._ping_llm(session, attempt_logs, post_wake=True),
+                    timeout=max(deadline - time.monotonic(), 0.1),
+                )
+            except asyncio.TimeoutError:
+                attempt_logs.append("⚠️ No answer before the wake budget ran out.")
+                up = False
+            if up:
+                logs.extend(attempt_logs)
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logs.extend(attempt_logs)
+                return False
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 2.0)
 
     async def _fetch_llm_models(self, session: aiohttp.ClientSession, logs: list[str]) -> list[str]:
         try:
-            async with session.get(f"{LLM_BASE_URL}/api/tags") as resp:
+            async with session.get(f"{LLM_BASE_URL}/api/tags", timeout=LLM_PROBE_TIMEOUT) as resp:
                 if resp.status == 200:
-                    data = await resp.json()
+                    data = orjson.loads(await resp.read())
                     models = [entry.get("name") for entry in data.get("models", []) if entry.get("name")]
                     logs.append(f"📦 Loaded manifests: {', '.join(models) if models else 'none'}")
                     return models
@@ -1,28 +1,33 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
 import base64
 import itertools
 import logging
 import os
 import re
 import tempfile
+import threading
 import time
-from collections import deque
-from dataclasses import dataclass
+from collections import Counter, deque
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, List, Deque, Dict, Any
+from types import MappingProxyType
+from typing import Optional, List, Deque, Dict, Any, Mapping, AsyncIterator, Awaitable, Callable
+from urllib.parse import urlparse
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+import aiohttp
+import orjson
+import redis.asyncio as aioredis
 import yt_dlp
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
 
-from branding import build_logo_file, logo_embed_url, logo_requires_attachment
+from branding import build_logo_file, logo_embed_url
 
 log = logging.getLogger(__name__)
 
@@ -31,9 +36,20 @@ log = logging.getLogger(__name__)
 # =========================
 FFMPEG_EXE = os.getenv("FFMPEG_EXE", "ffmpeg")
 
+
+def _opus_bitrate_cap() -> Optional[int]:
+    try:
+        return max(8, min(512, int(os.getenv("MUSIC_OPUS_BITRATE_MAX", ""))))
+    except ValueError:
+        return None
+
+
+OPUS_BITRATE_MAX: Optional[int] = _opus_bitrate_cap()  # kbps ceiling under the channel bitrate; unset = none
+
 # Caps (avoid monster queues)
 PLAYLIST_MAX = int(os.getenv("MUSIC_PLAYLIST_MAX", "50"))       # YouTube playlist item cap
 SPOTIFY_MAX = int(os.getenv("MUSIC_SPOTIFY_MAX", "100"))        # Spotify playlist/album item cap
+HISTORY_MAX = 5                                                  # tracks kept for back/forward navigation
 
 # UI refresher cadence (seconds)
 PROGRESS_UPDATE_SECONDS = float(os.getenv("MUSIC_PROGRESS_UPDATE_SECONDS", "5"))
@@ -42,11 +58,29 @@ PROGRESS_UPDATE_SECONDS = float(os.getenv("MUSIC_PROGRESS_UPDATE_SECONDS", "5"))
 DELETE_PANEL_ON_IDLE = os.getenv("MUSIC_DELETE_PANEL_ON_IDLE", "0") == "1"
 PANEL_BUMP_SECONDS = int(os.getenv("MUSIC_PANEL_BUMP_SECONDS", "45"))  # 0 disables bumping
 MUSIC_LAST_PLAYED_SECONDS = int(os.getenv("MUSIC_LAST_PLAYED_SECONDS", "20"))  # keep last track visible
+PANEL_DEBOUNCE_SECONDS = float(os.getenv("MUSIC_PANEL_DEBOUNCE_SECONDS", "0.5"))  # chat bursts -> one refresh
+VOICE_WAIT_SECONDS = float(os.getenv("MUSIC_VOICE_WAIT_SECONDS", "30"))  # hold queued tracks this long for voice
 
 # yt-dlp robustness knobs
 YT_PO_TOKEN = os.getenv("YT_PO_TOKEN", "").strip()  # optional Android PO token (android.gvs+XXXX)
 YTDL_SOCKET_TIMEOUT = float(os.getenv("YTDL_SOCKET_TIMEOUT", "20"))
 YTDL_MAX_RETRIES = int(os.getenv("YTDL_MAX_RETRIES", "2"))
+YTDL_CONCURRENCY = max(1, int(os.getenv("YTDL_CONCURRENCY", "8")))  # parallel yt-dlp lookups per import
+YT_CACHE_TTL = float(os.getenv("YT_CACHE_TTL_SECONDS", "1500"))  # stream URLs expire; keep under ~30m
+YT_CACHE_MAX = int(os.getenv("YT_CACHE_MAX", "512"))
+
+# Request pacing (token buckets) so concurrent imports stay under API throttling limits
+SPOTIFY_RATE_PER_SEC = float(os.getenv("MUSIC_SPOTIFY_RATE", "10"))
+YT_SEARCH_RATE_PER_SEC = float(os.getenv("MUSIC_YT_SEARCH_RATE", "5"))
+
+# Spotify -> YouTube resolution cache (in-process, plus optional shared Redis tier)
+SPOTIFY_CACHE_MAX = int(os.getenv("MUSIC_SPOTIFY_CACHE_MAX", "2048"))
+SPOTIFY_REDIS_URL = os.getenv("MUSIC_REDIS_URL", "").strip()    # e.g. redis://redis:6379/0; empty disables
+SPOTIFY_REDIS_TTL = int(os.getenv("MUSIC_REDIS_TTL_SECONDS", "86400"))
+SPOTIFY_REDIS_TIMEOUT = float(os.getenv("MUSIC_REDIS_TIMEOUT_SECONDS", "0.75"))  # connect + read, per call
+SPOTIFY_REDIS_COOLDOWN = float(os.getenv("MUSIC_REDIS_COOLDOWN_SECONDS", "60"))  # skip Redis after a failure
+# Album listings return simplified tracks (no album art); "1" re-fetches full objects in bulk.
+SPOTIFY_ENRICH = os.getenv("MUSIC_SPOTIFY_ENRICH", "0") == "1"
 
 # Cookies sources (choose one or none)
 YTDLP_COOKIES_FROM_BROWSER = os.getenv("YTDLP_COOKIES_FROM_BROWSER", "").strip()  # e.g. "chrome" or "firefox"
@@ -55,7 +89,18 @@ YTDLP_COOKIES_B64 = os.getenv("YTDLP_COOKIES_B64", "").strip()
 
 GLOBAL_MUSIC_PLAYERS: dict[int, "GuildPlayer"] = {}
 
-SPOTIFY_URL_RE = re.compile(r"https?://open\.spotify\.com/(track|album|playlist)/([A-Za-z0-9]+)")
+
+def panel_channel_ids(bot: commands.Bot) -> set[int]:
+    """Channel ids hosting a panel (on_message filters on this first); lives on the bot so it survives reloads."""
+    return bot.__dict__.setdefault("_music_panel_channels", set())
+
+
+# One pass classifies a /play input; alternation order matters (playlist before plain YouTube).
+_DISPATCH_RE = re.compile(
+    r"^https?://open\.spotify\.com/(?P<sp_kind>track|album|playlist)/(?P<sp_id>[A-Za-z0-9]+)"
+    r"|(?P<yt_playlist>(?i:youtube\.com/playlist|(?:youtube\.com|youtu\.be/).*[?&]list=))"
+    r"|(?P<yt>(?i:youtube\.com|youtu\.be))"
+)
 
 
 # =========================
@@ -69,7 +114,33 @@ def fmt_time(seconds: Optional[int]) -> str:
     return f"{h:d}:{m:02d}:{s:02d}" if h else f"{m:d}:{s:02d}"
 
 
-@dataclass
+class AsyncRateLimiter:
+    """Token bucket shared by concurrent tasks: at most `rate` acquisitions per `per` seconds."""
+
+    def __init__(self, rate: float, per: float = 1.0):
+        self.rate = max(1.0, rate)
+        self.per = per
+        self._tokens = self.rate
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+
+
+_SP_LIMIT = AsyncRateLimiter(SPOTIFY_RATE_PER_SEC, 1.0)
+_YT_LIMIT = AsyncRateLimiter(YT_SEARCH_RATE_PER_SEC, 1.0)
+
+
+@dataclass(slots=True)
 class Track:
     seq: Optional[int] = None
     title: str = ""
@@ -79,6 +150,20 @@ class Track:
     thumbnail: Optional[str] = None
     requested_by: Optional[discord.Member] = None
 
+    async def resolve(self, ytdl_opts: Mapping[str, Any]):
+        """Fill in the stream URL for tracks queued from flat playlist metadata."""
+        if self.stream_url:
+            return
+        full = await yt_extract(self.webpage_url, ytdl_opts=ytdl_opts)
+        self.stream_url = full.stream_url
+        self.duration = self.duration or full.duration
+        self.thumbnail = self.thumbnail or full.thumbnail
+        if not self.title or self.title == "Unknown":
+            self.title = full.title
+
+
+TrackCallback = Callable[[Track], Awaitable[None]]
+
 
 # =========================
 # yt-dlp base options
@@ -107,19 +192,56 @@ def build_base_ytdl_opts() -> Dict[str, Any]:
     return opts
 
 
-BASE_YTDL_OPTS = build_base_ytdl_opts()
+YTDL_OPTS_BASE: Mapping[str, Any] = MappingProxyType(build_base_ytdl_opts())
+
+# Per-call tweaks layered over the base options; built once per variant (and cookie file).
+_YTDL_VARIANT_OVERRIDES: Dict[str, Dict[str, Any]] = {
+    "base": {},
+    "playlist_flat": {"noplaylist": False, "extract_flat": True},
+    # Second pass on clients the base list doesn't try, for when android+web both come back stream-less.
+    "fallback": {
+        "extractor_args": {
+            "youtube": {**YTDL_OPTS_BASE["extractor_args"]["youtube"], "player_client": ["tv", "web_safari"]},
+        },
+    },
+}
+_YTDL_VARIANTS: Dict[tuple[str, Optional[str]], Mapping[str, Any]] = {}
+
+def ytdl_opts_variant(variant: str, cookiefile: Optional[str] = None) -> Mapping[str, Any]:
+    key = (variant, cookiefile)
+    opts = _YTDL_VARIANTS.get(key)
+    if opts is None:
+        built = dict(YTDL_OPTS_BASE)
+        if cookiefile:
+            built["cookiefile"] = cookiefile
+        built.update(_YTDL_VARIANT_OVERRIDES[variant])
+        opts = _YTDL_VARIANTS[key] = MappingProxyType(built)
+    return opts
 
 
 # =========================
 # Async wrappers (keep loop snappy)
 # =========================
-async def _ydl_extract_async(url: str, opts: dict):
+# YoutubeDL instances are expensive to build (option parsing, extractor setup, cookie jar)
+# but not safe to share across threads, so each worker thread keeps one per opts variant.
+_YDL_LOCAL = threading.local()
+
+def _cached_ydl(opts: Mapping[str, Any]) -> yt_dlp.YoutubeDL:
+    cache: Optional[Dict[frozenset, yt_dlp.YoutubeDL]] = getattr(_YDL_LOCAL, "cache", None)
+    if cache is None:
+        cache = _YDL_LOCAL.cache = {}
+    key = frozenset((k, repr(v)) for k, v in opts.items())
+    ydl = cache.get(key)
+    if ydl is None:
+        ydl = cache[key] = yt_dlp.YoutubeDL(dict(opts))
+    return ydl
+
+async def _ydl_extract_async(url: str, opts: Mapping[str, Any]):
     def _do():
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            return ydl.extract_info(url, download=False)
+        return _cached_ydl(opts).extract_info(url, download=False)
     return await asyncio.to_thread(_do)
 
-async def _extract_with_retries(url: str, opts: dict, *, tries: int = None):
+async def _extract_with_retries(url: str, opts: Mapping[str, Any], *, tries: int = None):
     tries = YTDL_MAX_RETRIES if tries is None else tries
     last_err = None
     for _ in range(tries + 1):
@@ -141,14 +263,97 @@ def write_temp_cookie_file_from_b64(b64: str) -> Path:
     return Path(path)
 
 
+# One decoded copy per process; every player and track reuses it until shutdown.
+_COOKIE_FILE_LOCK = threading.Lock()
+_CACHED_COOKIE_PATH: Optional[Path] = None
+
+def _remove_shared_cookie_file():
+    if _CACHED_COOKIE_PATH is not None:
+        try:
+            _CACHED_COOKIE_PATH.unlink(missing_ok=True)
+        except OSError:
+            log.debug("Failed to delete temp cookies file %s", _CACHED_COOKIE_PATH)
+
+def get_shared_cookie_path() -> Optional[Path]:
+    global _CACHED_COOKIE_PATH
+    if _CACHED_COOKIE_PATH is not None or not YTDLP_COOKIES_B64:
+        return _CACHED_COOKIE_PATH
+    with _COOKIE_FILE_LOCK:
+        if _CACHED_COOKIE_PATH is None:
+            try:
+                _CACHED_COOKIE_PATH = write_temp_cookie_file_from_b64(YTDLP_COOKIES_B64)
+            except Exception:
+                log.exception("Failed to create temp cookies file from YTDLP_COOKIES_B64")
+                return None
+            atexit.register(_remove_shared_cookie_file)
+            log.info("Created temp cookies file %s", _CACHED_COOKIE_PATH)
+    return _CACHED_COOKIE_PATH
+
+
 # =========================
-# YouTube helpers (async + robust)
+# Extraction result cache (URL / search query -> Track)
 # =========================
-def _is_yt_playlist(url: str) -> bool:
-    u = url.lower()
-    return ("youtube.com/playlist" in u) or ("list=" in u and ("youtube.com" in u or "youtu.be/" in u))
+_YT_CACHE: Dict[str, tuple[float, Track]] = {}
+
+def _yt_cache_get(key: str) -> Optional[Track]:
+    hit = _YT_CACHE.get(key)
+    if not hit:
+        return None
+    ts, track = hit
+    if time.monotonic() - ts >= YT_CACHE_TTL:
+        _YT_CACHE.pop(key, None)
+        return None
+    return replace(track, requested_by=None)
+
+def _yt_cache_put(key: str, track: Track):
+    if YT_CACHE_TTL <= 0 or YT_CACHE_MAX <= 0:
+        return
+    now = time.monotonic()
+    _YT_CACHE.pop(key, None)
+    _YT_CACHE[key] = (now, track)
+    if len(_YT_CACHE) > YT_CACHE_MAX:
+        for k in [k for k, (ts, _) in _YT_CACHE.items() if now - ts >= YT_CACHE_TTL]:
+            del _YT_CACHE[k]
+        # Still full: drop the oldest inserts (dicts keep insertion order).
+        while len(_YT_CACHE) > YT_CACHE_MAX:
+            del _YT_CACHE[next(iter(_YT_CACHE))]
+
 
-async def yt_extract(url: str, *, ytdl_opts: dict) -> Track:
+# =========================
+# YouTube helpers (async + robust)
+# =========================
+def classify_query(query: str) -> tuple[str, Optional[re.Match]]:
+    """Return ("spotify" | "yt_playlist" | "yt" | "search", match) for a /play input."""
+    m = _DISPATCH_RE.search(query)
+    if not m:
+        return "search", None
+    if m.group("sp_kind"):
+        return "spotify", m
+    return ("yt_playlist" if m.group("yt_playlist") else "yt"), m
+
+# Cheap gate before any network work: a link we can dispatch, or 2-200 chars with at least one word character.
+_QUERY_RE = re.compile(r"(?:https?://\S+|(?=.*\w).{2,200})", re.S)
+_PLAY_HOSTS = frozenset({
+    "youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com", "youtu.be", "open.spotify.com",
+})
+
+def is_playable_query(query: str) -> bool:
+    if not _QUERY_RE.fullmatch(query):
+        return False
+    parsed = urlparse(query)
+    if parsed.scheme.lower() in ("http", "https"):
+        return (parsed.hostname or "").lower() in _PLAY_HOSTS
+    return True
+
+async def yt_extract(url: str, *, ytdl_opts: Mapping[str, Any]) -> Track:
+    cached = _yt_cache_get(url)
+    if cached:
+        return cached
+    track = await _yt_extract_uncached(url, ytdl_opts=ytdl_opts)
+    _yt_cache_put(url, track)
+    return replace(track)
+
+async def _yt_extract_uncached(url: str, *, ytdl_opts: Mapping[str, Any]) -> Track:
     info = await _extract_with_retries(url, ytdl_opts)
     if info and "entries" in info:
         info = info["entries"][0]
@@ -159,20 +364,21 @@ async def yt_extract(url: str, *, ytdl_opts: dict) -> Track:
         stream = info_obj.get("url")
         if stream:
             return stream
-        fmts = info_obj.get("formats") or []
-        best = max(
-            (f for f in fmts if f.get("acodec") not in (None, "none")),
-            key=lambda f: f.get("abr") or 0,
-            default=None,
-        )
-        return best.get("url") if best else None
+        best_abr = -1
+        best_url = None
+        for f in info_obj.get("formats") or []:
+            if f.get("acodec") in (None, "none"):
+                continue
+            abr = f.get("abr") or 0
+            if abr > best_abr:
+                best_abr = abr
+                best_url = f.get("url")
+        return best_url
 
     stream = _pick_stream(info)
     if not stream:
-        # Retry with android+web so yt-dlp can still return a stream when web-only gets SABR-gated.
-        web_only = dict(ytdl_opts)
-        web_only["extractor_args"] = {"youtube": {"player_client": ["android", "web"]}}
-        info2 = await _extract_with_retries(url, web_only)
+        fallback = ytdl_opts_variant("fallback", ytdl_opts.get("cookiefile"))
+        info2 = await _extract_with_retries(url, fallback)
         if info2 and "entries" in info2:
             info2 = info2["entries"][0]
         stream = _pick_stream(info2 or {})
@@ -192,13 +398,38 @@ async def yt_extract(url: str, *, ytdl_opts: dict) -> Track:
         requested_by=None,
     )
 
-async def yt_search_first(query: str, *, ytdl_opts: dict) -> Track:
-    return await yt_extract(f"ytsearch1:{query}", ytdl_opts=ytdl_opts)
+async def yt_search_first(query: str, *, ytdl_opts: Mapping[str, Any]) -> Track:
+    url = "ytsearch1:" + " ".join(query.lower().split())
+    if _yt_cache_get(url) is None:
+        await _YT_LIMIT.acquire()  # only real searches count against the budget
+    return await yt_extract(url, ytdl_opts=ytdl_opts)
+
+async def yt_search_iter(queries: List[str], *, ytdl_opts: Mapping[str, Any]) -> AsyncIterator[Optional[Track]]:
+    """
+    Run searches concurrently (bounded) and yield results in query order as soon as each
+    prefix is ready, so the first track is usable before the slowest search finishes.
+    Failed lookups yield None.
+    """
+    sem = asyncio.Semaphore(YTDL_CONCURRENCY)
+
+    async def _bounded(q: str) -> Optional[Track]:
+        async with sem:
+            try:
+                return await yt_search_first(q, ytdl_opts=ytdl_opts)
+            except Exception as e:
+                log.debug("Search failed for %r: %s", q, e)
+                return None
+
+    tasks = [asyncio.create_task(_bounded(q)) for q in queries]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
 
-async def yt_extract_playlist(url: str, *, ytdl_opts: dict) -> List[Track]:
-    opts = dict(ytdl_opts)
-    opts["noplaylist"] = False
-    opts["extract_flat"] = True
+async def yt_extract_playlist(url: str, *, ytdl_opts: Mapping[str, Any]) -> List[Track]:
+    opts = ytdl_opts_variant("playlist_flat", ytdl_opts.get("cookiefile"))
 
     info = await _extract_with_retries(url, opts)
     if not info:
@@ -206,7 +437,6 @@ async def yt_extract_playlist(url: str, *, ytdl_opts: dict) -> List[Track]:
 
     playlist_id = (info.get("id") or "") if isinstance(info, dict) else ""
     entries = info.get("entries") or []
-    out: List[Track] = []
 
     def _normalize_url(entry: Dict[str, Any]) -> Optional[str]:
         vid = entry.get("id")
@@ -217,17 +447,21 @@ async def yt_extract_playlist(url: str, *, ytdl_opts: dict) -> List[Track]:
             return f"https://www.youtube.com/watch?v={vid}" + (f"&list={playlist_id}" if playlist_id else "")
         return None
 
-    for i, entry in enumerate(entries):
-        if i >= PLAYLIST_MAX:
-            break
+    # Flat entries already carry title/duration; stream URLs are resolved lazily at playback.
+    out: List[Track] = []
+    for entry in entries[:PLAYLIST_MAX]:
         page_url = _normalize_url(entry)
         if not page_url:
             continue
-        try:
-            t = await yt_extract(page_url, ytdl_opts=ytdl_opts)
-            out.append(t)
-        except Exception:
-            continue
+        thumbs = entry.get("thumbnails") or []
+        out.append(
+            Track(
+                title=entry.get("title") or "Unknown",
+                webpage_url=page_url,
+                duration=entry.get("duration"),
+                thumbnail=thumbs[-1].get("url") if thumbs else None,
+            )
+        )
 
     if not out:
         raise RuntimeError("Playlist contained no playable tracks")
@@ -237,93 +471,370 @@ async def yt_extract_playlist(url: str, *, ytdl_opts: dict) -> List[Track]:
 # =========================
 # Spotify helpers
 # =========================
-def make_spotify():
-    cid = os.getenv("SPOTIFY_CLIENT_ID")
-    csec = os.getenv("SPOTIFY_CLIENT_SECRET")
-    if not cid or not csec:
+SPOTIFY_API_BASE = "https://api.spotify.com/v1/"
+SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
+
+
+class SpotifyClient:
+    """Minimal async Spotify Web API client (client-credentials) on one keep-alive aiohttp session."""
+
+    def __init__(self, client_id: str, client_secret: str, *, timeout: float = 15, retries: int = 3):
+        self._auth = aiohttp.BasicAuth(client_id, client_secret)
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._retries = retries
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._token: Optional[str] = None
+        self._token_expires_mono: float = 0.0
+        self._token_lock = asyncio.Lock()
+
+    def _http(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self._timeout,
+                connector=aiohttp.TCPConnector(limit=50, limit_per_host=20, keepalive_timeout=75),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _bearer(self) -> str:
+        if self._token and time.monotonic() < self._token_expires_mono:
+            return self._token
+        async with self._token_lock:
+            if self._token and time.monotonic() < self._token_expires_mono:
+                return self._token
+            async with self._http().post(
+                SPOTIFY_TOKEN_URL, data={"grant_type": "client_credentials"}, auth=self._auth
+            ) as resp:
+                if resp.status != 200:
+                    raise RuntimeError(f"Spotify auth failed (HTTP {resp.status})")
+                data = orjson.loads(await resp.read())
+            self._token = data["access_token"]
+            # Tokens last an hour; refresh a minute early.
+            self._token_expires_mono = time.monotonic() + max(60, int(data.get("expires_in", 3600)) - 60)
+            return self._token
+
+    async def get(self, path: str, **params) -> Dict[str, Any]:
+        status = 0
+        error: Optional[BaseException] = None
+        for attempt in range(self._retries + 1):
+            retry_after = None
+            try:
+                headers = {"Authorization": f"Bearer {await self._bearer()}"}
+                await _SP_LIMIT.acquire()
+                async with self._http().get(SPOTIFY_API_BASE + path, params=params, headers=headers) as resp:
+                    status = resp.status
+                    if status == 200:
+                        return orjson.loads(await resp.read())
+                    retry_after = resp.headers.get("Retry-After")
+                error = None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Connection resets and timeouts are transient; retry them like a 5xx.
+                status, error = 0, e
+            if status == 401:
+                self._token = None
+            elif status and status != 429 and status < 500:
+                break
+            if attempt < self._retries and status != 401:
+                try:
+                    delay = float(retry_after) if retry_after else 2 ** attempt
+                except ValueError:
+                    delay = 2 ** attempt
+                await asyncio.sleep(min(delay, 30))
+        if error is not None:
+            raise RuntimeError(f"Spotify API request failed for {path}: {str(error) or type(error).__name__}") from error
+        raise RuntimeError(f"Spotify API error (HTTP {status}) for {path}")
+
+    async def track(self, track_id: str) -> Dict[str, Any]:
+        return await self.get(f"tracks/{track_id}")
+
+    async def album_tracks(self, album_id: str, *, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        return await self.get(f"albums/{album_id}/tracks", limit=limit, offset=offset)
+
+    async def playlist_items(self, playlist_id: str, *, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+        return await self.get(
+            f"playlists/{playlist_id}/tracks", additional_types="track", limit=limit, offset=offset
+        )
+
+    async def tracks(self, track_ids: List[str]) -> Dict[str, Any]:
+        # Bulk endpoint: up to 50 ids per request.
+        return await self.get("tracks", ids=",".join(track_ids))
+
+
+_SP_SINGLETON: Optional[SpotifyClient] = None
+
+def make_spotify() -> Optional[SpotifyClient]:
+    """Return the shared Spotify client (None when credentials are not configured)."""
+    global _SP_SINGLETON
+    if _SP_SINGLETON is None:
+        cid = os.getenv("SPOTIFY_CLIENT_ID")
+        csec = os.getenv("SPOTIFY_CLIENT_SECRET")
+        if not cid or not csec:
+            return None
+        _SP_SINGLETON = SpotifyClient(cid, csec)
+    return _SP_SINGLETON
+
+async def close_spotify():
+    global _SP_REDIS
+    if _SP_SINGLETON is not None:
+        await _SP_SINGLETON.close()
+    if _SP_REDIS is not None:
+        try:
+            await _SP_REDIS.aclose()
+        except Exception:
+            log.debug("Redis close failed", exc_info=True)
+        _SP_REDIS = None
+
+
+# =========================
+# Spotify -> YouTube resolution cache
+# =========================
+# Only page metadata is cached; stream URLs expire and are resolved at playback (Track.resolve).
+_SP_YT_CACHE: Dict[str, Dict[str, Any]] = {}
+_SP_REDIS: Optional[aioredis.Redis] = None
+_SP_REDIS_PREFIX = "discbot:sp2yt:"
+_SP_REDIS_DOWN_UNTIL = 0.0  # monotonic; Redis tier is skipped until then
+_BRACKETED_RE = re.compile(r"\s*[(\[][^)\]]*[)\]]")
+
+def _spotify_query(t: Dict[str, Any]) -> str:
+    artists = t.get("artists") or []
+    artist_name = artists[0]["name"] if artists else ""
+    return f"{artist_name} {t['name']} audio"
+
+def _normalize_query(query: str) -> str:
+    # "Song (Remastered 2011)" and "song" should share a cache slot.
+    return " ".join(_BRACKETED_RE.sub("", query).lower().split())
+
+def _spotify_cache_key(t: Dict[str, Any]) -> str:
+    tid = t.get("id")
+    return f"spotify:{tid}" if tid else f"q:{_normalize_query(_spotify_query(t))}"
+
+def _track_meta(track: Track) -> Dict[str, Any]:
+    return {
+        "title": track.title,
+        "webpage_url": track.webpage_url,
+        "duration": track.duration,
+        "thumbnail": track.thumbnail,
+    }
+
+def _track_from_meta(meta: Dict[str, Any]) -> Track:
+    return Track(
+        title=meta.get("title") or "Unknown",
+        webpage_url=meta["webpage_url"],
+        duration=meta.get("duration"),
+        thumbnail=meta.get("thumbnail"),
+    )
+
+def _sp_redis() -> Optional[aioredis.Redis]:
+    global _SP_REDIS
+    if not SPOTIFY_REDIS_URL or time.monotonic() < _SP_REDIS_DOWN_UNTIL:
         return None
-    auth = SpotifyClientCredentials(client_id=cid, client_secret=csec)
-    return spotipy.Spotify(auth_manager=auth, requests_timeout=15, retries=3)
-
-def _spotify_page_album_tracks(sp: spotipy.Spotify, album_id: str, limit: int = 50):
-    fetched = 0
-    offset = 0
-    while True:
-        page = sp.album_tracks(album_id, limit=limit, offset=offset)
-        items = page.get("items", [])
-        if not items:
-            break
-        for it in items:
-            yield it
-            fetched += 1
-        if fetched >= SPOTIFY_MAX:
-            break
-        offset += len(items)
-        if len(items) < limit:
-            break
-
-def _spotify_page_playlist_items(sp: spotipy.Spotify, playlist_id: str, limit: int = 100):
-    fetched = 0
-    offset = 0
-    while True:
-        page = sp.playlist_items(playlist_id, additional_types=("track",), limit=limit, offset=offset)
-        items = page.get("items", [])
-        if not items:
-            break
-        for it in items:
-            yield it
-            fetched += 1
-        if fetched >= SPOTIFY_MAX:
-            break
-        offset += len(items)
-        if len(items) < limit:
-            break
-
-async def create_tracks_from_query(query: str, *, ytdl_opts: dict) -> List[Track]:
-    m = SPOTIFY_URL_RE.match(query)
-    if m:
-        kind, ident = m.groups()
+    if _SP_REDIS is None:
+        _SP_REDIS = aioredis.from_url(
+            SPOTIFY_REDIS_URL,
+            socket_connect_timeout=SPOTIFY_REDIS_TIMEOUT,
+            socket_timeout=SPOTIFY_REDIS_TIMEOUT,
+        )
+    return _SP_REDIS
+
+def _sp_redis_failed(what: str, e: Exception):
+    # An unreachable Redis would otherwise cost a timeout on every lookup; fall back to local-only for a while.
+    global _SP_REDIS_DOWN_UNTIL
+    _SP_REDIS_DOWN_UNTIL = time.monotonic() + SPOTIFY_REDIS_COOLDOWN
+    log.warning("Spotify cache %s in Redis failed; skipping Redis for %gs: %s", what, SPOTIFY_REDIS_COOLDOWN, e)
+
+def _sp_cache_put_local(key: str, meta: Dict[str, Any]):
+    if SPOTIFY_CACHE_MAX <= 0:
+        return
+    _SP_YT_CACHE.pop(key, None)
+    _SP_YT_CACHE[key] = meta
+    while len(_SP_YT_CACHE) > SPOTIFY_CACHE_MAX:
+        del _SP_YT_CACHE[next(iter(_SP_YT_CACHE))]
+
+async def _sp_cache_get(keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+    out = [_SP_YT_CACHE.get(k) for k in keys]
+    missing = [i for i, meta in enumerate(out) if meta is None]
+    r = _sp_redis()
+    if r is not None and missing:
+        try:
+            blobs = await r.mget([_SP_REDIS_PREFIX + keys[i] for i in missing])
+            for i, blob in zip(missing, blobs):
+                if blob:
+                    out[i] = orjson.loads(blob)
+                    _sp_cache_put_local(keys[i], out[i])
+        except Exception as e:
+            _sp_redis_failed("lookup", e)
+    return out
+
+async def _sp_cache_put(entries: List[tuple[str, Track]]):
+    metas = [(key, _track_meta(track)) for key, track in entries]
+    for key, meta in metas:
+        _sp_cache_put_local(key, meta)
+    r = _sp_redis()
+    if r is not None and metas:
+        try:
+            async with r.pipeline(transaction=False) as pipe:
+                for key, meta in metas:
+                    pipe.setex(_SP_REDIS_PREFIX + key, SPOTIFY_REDIS_TTL, orjson.dumps(meta))
+                await pipe.execute()
+        except Exception as e:
+            _sp_redis_failed("store", e)
+
+def _spotify_album_art(t: Dict[str, Any]) -> Optional[str]:
+    images = (t.get("album") or {}).get("images") or []
+    # Spotify lists images largest first.
+    return images[0].get("url") if images else None
+
+async def _sp_tracks_bulk(sp: SpotifyClient, track_ids: List[str]) -> List[Dict[str, Any]]:
+    """Fetch full track objects 50 ids per request instead of one call per track."""
+    chunks = [track_ids[i:i + 50] for i in range(0, len(track_ids), 50)]
+    pages = await asyncio.gather(*(sp.tracks(chunk) for chunk in chunks))
+    return [t for page in pages for t in (page.get("tracks") or []) if t]
+
+async def _spotify_to_youtube(
+    sp_tracks: List[Dict[str, Any]],
+    *,
+    ytdl_opts: Mapping[str, Any],
+    on_track: Optional[TrackCallback] = None,
+) -> List[Track]:
+    """Map Spotify track objects to YouTube tracks in order, searching only for cache misses."""
+    keys = [_spotify_cache_key(t) for t in sp_tracks]
+    metas = await _sp_cache_get(keys)
+    # Repeats (same song on several albums, re-adds) share one search; slots follow first appearance.
+    slot_of: Dict[int, int] = {}
+    uniq: Dict[str, int] = {}
+    queries: List[str] = []
+    for i, meta in enumerate(metas):
+        if meta is None:
+            q = _spotify_query(sp_tracks[i])
+            slot = uniq.setdefault(_normalize_query(q), len(queries))
+            if slot == len(queries):
+                queries.append(q)
+            slot_of[i] = slot
+    misses = yt_search_iter(queries, ytdl_opts=ytdl_opts)
+    found: List[Optional[Track]] = []
+    out: List[Track] = []
+    fresh: List[tuple[str, Track]] = []
+    try:
+        for i, meta in enumerate(metas):
+            if meta is not None:
+                track: Optional[Track] = _track_from_meta(meta)
+            elif slot_of[i] < len(found):
+                track = found[slot_of[i]]
+                if track:
+                    fresh.append((keys[i], track))
+            else:
+                track = await anext(misses)
+                found.append(track)
+                if track:
+                    track.thumbnail = _spotify_album_art(sp_tracks[i]) or track.thumbnail
+                    fresh.append((keys[i], track))
+            if track:
+                out.append(track)
+                if on_track:
+                    await on_track(track)
+    finally:
+        await misses.aclose()
+        await _sp_cache_put(fresh)
+    return out
+
+async def _spotify_iter_pages(fetch_page, limit: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield page items in order (up to SPOTIFY_MAX). Page 0 is handed out as soon as it lands;
+    the remaining pages are requested right after, so they download while earlier ones are searched.
+    """
+    first = await fetch_page(0)
+    items = list(first.get("items") or [])
+    total = min(first.get("total") or len(items), SPOTIFY_MAX)
+    tasks = (
+        [asyncio.create_task(fetch_page(off)) for off in range(limit, total, limit)]
+        if len(items) >= limit and total > limit else []
+    )
+    try:
+        yield items
+        for task in tasks:
+            page = await task
+            yield list(page.get("items") or [])
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def _spotify_album_pages(sp: SpotifyClient, album_id: str, limit: int = 50) -> AsyncIterator[List[Dict[str, Any]]]:
+    return _spotify_iter_pages(lambda offset: sp.album_tracks(album_id, limit=limit, offset=offset), limit)
+
+def _spotify_playlist_pages(sp: SpotifyClient, playlist_id: str, limit: int = 100) -> AsyncIterator[List[Dict[str, Any]]]:
+    return _spotify_iter_pages(lambda offset: sp.playlist_items(playlist_id, limit=limit, offset=offset), limit)
+
+async def create_tracks_from_query(
+    query: str, *, ytdl_opts: Mapping[str, Any], on_track: Optional[TrackCallback] = None
+) -> List[Track]:
+    """
+    Resolve a /play input into tracks. When `on_track` is given it is awaited for each
+    track, in order, as soon as that track is ready (multi-track imports stream in).
+    """
+    source, m = classify_query(query)
+    if source == "spotify":
+        kind, ident = m.group("sp_kind"), m.group("sp_id")
         sp = make_spotify()
         if not sp:
             raise RuntimeError("Spotify credentials missing")
         results: List[Track] = []
 
         if kind == "track":
-            t = sp.track(ident)
-            results.append(await yt_search_first(f"{t['artists'][0]['name']} {t['name']} audio", ytdl_opts=ytdl_opts))
-
-        elif kind == "album":
-            count = 0
-            for t in _spotify_page_album_tracks(sp, ident):
-                q = f"{t['artists'][0]['name']} {t['name']} audio"
-                results.append(await yt_search_first(q, ytdl_opts=ytdl_opts))
-                count += 1
-                if count >= SPOTIFY_MAX:
-                    break
-
-        elif kind == "playlist":
-            count = 0
-            for it in _spotify_page_playlist_items(sp, ident):
-                t = it.get("track")
-                if not t or t.get("is_local"):
-                    continue
-                artists = t.get("artists") or []
-                artist_name = artists[0]["name"] if artists else ""
-                q = f"{artist_name} {t['name']} audio"
-                results.append(await yt_search_first(q, ytdl_opts=ytdl_opts))
-                count += 1
-                if count >= SPOTIFY_MAX:
-                    break
-
-        return results
-
-    if _is_yt_playlist(query):
-        return await yt_extract_playlist(query, ytdl_opts=ytdl_opts)
-
-    if "youtube.com" in query or "youtu.be" in query:
-        return [await yt_extract(query, ytdl_opts=ytdl_opts)]
-
-    return [await yt_search_first(query, ytdl_opts=ytdl_opts)]
+            # Overlap the metadata roundtrip with the cache lookup; a hit just drops the request.
+            meta_task = asyncio.create_task(sp.track(ident))
+            try:
+                cached = (await _sp_cache_get([f"spotify:{ident}"]))[0]
+            except BaseException:
+                meta_task.cancel()
+                raise
+            if cached:
+                meta_task.cancel()
+                results = [_track_from_meta(cached)]
+            else:
+                sp_track = await meta_task
+                track = await yt_search_first(_spotify_query(sp_track), ytdl_opts=ytdl_opts)
+                track.thumbnail = _spotify_album_art(sp_track) or track.thumbnail
+                await _sp_cache_put([(_spotify_cache_key(sp_track), track)])
+                results = [track]
+
+        elif kind in ("album", "playlist"):
+            pages = _spotify_album_pages(sp, ident) if kind == "album" else _spotify_playlist_pages(sp, ident)
+            budget = SPOTIFY_MAX
+            try:
+                async for page in pages:
+                    if kind == "album":
+                        sp_tracks = page
+                        if SPOTIFY_ENRICH and sp_tracks:
+                            sp_tracks = await _sp_tracks_bulk(sp, [t["id"] for t in sp_tracks if t.get("id")])
+                    else:
+                        # Local files have no Spotify metadata worth searching; drop them before any work is queued.
+                        sp_tracks = [t for it in page if (t := it.get("track")) and not t.get("is_local")]
+                    sp_tracks = sp_tracks[:budget]
+                    budget -= len(sp_tracks)
+                    results += await _spotify_to_youtube(sp_tracks, ytdl_opts=ytdl_opts, on_track=on_track)
+                    if budget <= 0:
+                        break
+            finally:
+                await pages.aclose()
+            return results
+
+    elif source == "yt_playlist":
+        results = await yt_extract_playlist(query, ytdl_opts=ytdl_opts)
+
+    elif source == "yt":
+        results = [await yt_extract(query, ytdl_opts=ytdl_opts)]
+
+    else:
+        results = [await yt_search_first(query, ytdl_opts=ytdl_opts)]
+
+    if on_track:
+        for t in results:
+            await on_track(t)
+    return results
 
 
 # =========================
@@ -334,7 +845,10 @@ class ControlView(discord.ui.View):
         super().__init__(timeout=None)  # persistent
         self.bot = bot
         self.player = player
-        self._sync_buttons()
+        self._prev_btn: Optional[discord.ui.Button] = next(
+            (c for c in self.children if isinstance(c, discord.ui.Button) and c.custom_id == "music_prev"), None
+        )
+        self.update_states()
 
     def _player(self, inter: discord.Interaction) -> "GuildPlayer":
         if self.player:
@@ -342,52 +856,52 @@ class ControlView(discord.ui.View):
         cog: Music = self.bot.get_cog("Music")  # type: ignore
         return cog.get_player(inter.guild)  # type: ignore
 
-    def _sync_buttons(self):
-        prev_button = next((c for c in self.children if isinstance(c, discord.ui.Button) and c.custom_id == "music_prev"), None)
-        if prev_button:
+    def update_states(self):
+        """Refresh per-state button flags; call before re-sending this view."""
+        if self._prev_btn:
             p = self.player
-            prev_button.disabled = not (p and p.can_go_previous())
+            self._prev_btn.disabled = not (p and p.can_go_previous())
 
     @discord.ui.button(emoji="⏮️", style=discord.ButtonStyle.secondary, custom_id="music_prev")
     async def prev(self, inter: discord.Interaction, _: discord.ui.Button):
+        # Ack first so slow player work never trips Discord's 3s interaction deadline.
+        await inter.response.defer()
         p = self._player(inter)
         if not p.can_go_previous():
-            await inter.response.defer()
             return
         p.play_previous()
-        await inter.response.defer()
         await p.post_or_update_panel()
 
     @discord.ui.button(emoji="◼️", style=discord.ButtonStyle.danger, custom_id="music_stop")
     async def stop(self, inter: discord.Interaction, _: discord.ui.Button):
+        await inter.response.defer()
         p = self._player(inter)
         p.stop()
-        await inter.response.defer()
         await p.post_or_update_panel()
 
     @discord.ui.button(emoji="⏯️", style=discord.ButtonStyle.primary, custom_id="music_toggle")
     async def toggle(self, inter: discord.Interaction, _: discord.ui.Button):
+        await inter.response.defer()
         p = self._player(inter)
         if p.voice and p.voice.is_playing():
             p.pause()
         elif p.voice and p.voice.is_paused():
             p.resume()
-        await inter.response.defer()
         await p.post_or_update_panel()
 
     @discord.ui.button(emoji="⏭️", style=discord.ButtonStyle.secondary, custom_id="music_next")
     async def next(self, inter: discord.Interaction, _: discord.ui.Button):
+        await inter.response.defer()
         p = self._player(inter)
         p.skip()
-        await inter.response.defer()
         await p.post_or_update_panel()
 
     @discord.ui.button(emoji="🔁", style=discord.ButtonStyle.secondary, custom_id="music_repeat")
     async def repeat(self, inter: discord.Interaction, _: discord.ui.Button):
+        await inter.response.defer()
         p = self._player(inter)
         nxt = {"off": "one", "one": "all", "all": "off"}[p.repeat_mode]
         p.repeat_mode = nxt
-        await inter.response.defer()
         await p.post_or_update_panel()
 
 
@@ -399,7 +913,16 @@ class RepeatModeView(discord.ui.View):
         self.music_cog = music_cog
         self.guild_id = guild.id
         self.current_mode = current_mode
+        self._active_cid = f"repeat_{current_mode}"
+        self._btns: Dict[str, discord.ui.Button] = {
+            c.custom_id: c for c in self.children if isinstance(c, discord.ui.Button) and c.custom_id
+        }
         self._refresh_styles()
+        # Latest interaction on the ephemeral message; its token is what lets on_timeout edit it.
+        self._interaction: Optional[discord.Interaction] = None
+
+    def bind(self, interaction: discord.Interaction):
+        self._interaction = interaction
 
     def _player(self, guild: discord.Guild | None):
         if guild is None:
@@ -407,25 +930,20 @@ class RepeatModeView(discord.ui.View):
         return self.music_cog.get_player(guild)
 
     def _refresh_styles(self):
-        for child in self.children:
-            if isinstance(child, discord.ui.Button):
-                child.style = (
-                    discord.ButtonStyle.success
-                    if child.custom_id == f"repeat_{self.current_mode}"
-                    else discord.ButtonStyle.secondary
-                )
+        for cid, btn in self._btns.items():
+            btn.style = discord.ButtonStyle.success if cid == self._active_cid else discord.ButtonStyle.secondary
 
     async def _set_mode(self, interaction: discord.Interaction, mode: str):
+        await interaction.response.defer()
         player = self._player(interaction.guild)
         player.repeat_mode = mode
         self.current_mode = mode
+        self._active_cid = f"repeat_{mode}"
         self._refresh_styles()
 
+        self._interaction = interaction
         content = f"Repeat mode locked to **{mode}**"
-        if interaction.response.is_done():
-            await interaction.edit_original_response(content=content, view=self)
-        else:
-            await interaction.response.edit_message(content=content, view=self)
+        await interaction.edit_original_response(content=content, view=self)
         await player.post_or_update_panel()
 
     @discord.ui.button(label="Off", emoji="🚫", custom_id="repeat_off")
@@ -444,24 +962,84 @@ class RepeatModeView(discord.ui.View):
         for child in self.children:
             if isinstance(child, discord.ui.Button):
                 child.disabled = True
-        if getattr(self, "message", None):
+        interaction, self._interaction = self._interaction, None
+        if interaction:
             try:
-                await self.message.edit(view=self)
+                await interaction.edit_original_response(view=self)
             except discord.HTTPException:
                 pass
+        # The view is done; drop what it was pinning so it can be collected right away.
+        self._btns.clear()
+        self.music_cog = None  # type: ignore[assignment]
+
+
+# =========================
+# Panel + FFmpeg presets
+# =========================
+_PALETTE: Mapping[str, int] = MappingProxyType({"off": 0x5865F2, "one": 0xFEE75C, "all": 0x57F287})
+_MODE_BADGE: Mapping[str, str] = MappingProxyType({"off": "🚫 Off", "one": "🔂 Single", "all": "🔁 Queue"})
+# Progress bar is fixed-width, so every fill level is prebuilt
+_BAR_W = 18
+_BAR_TABLE = tuple("▰" * i + "▱" * (_BAR_W - i) for i in range(_BAR_W + 1))
+
+# Robust network flags; DO NOT throttle with -re
+_FFMPEG_BEFORE_OPTS = (
+    "-nostdin "
+    "-rw_timeout 30000000 "
+    "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 "
+    "-probesize 10000000 -analyzeduration 10000000"
+)
+# Keep timestamps and speed stable; resample deterministically to 48k stereo s16
+_FFMPEG_AUDIO_FILTERS = (
+    "aresample=async=1:min_hard_comp=0.1:first_pts=0,"
+    "aresample=48000,"
+    "aformat=sample_fmts=s16:channel_layouts=stereo"
+)
+_FFMPEG_OPUS_OPTS = (
+    f"-vn -sn -dn -af {_FFMPEG_AUDIO_FILTERS} "
+    "-application audio "
+    "-vbr on "
+    "-compression_level 10 "
+    "-frame_duration 20"
+)
 
 
 # =========================
 # Player
 # =========================
+@dataclass(slots=True, frozen=True)
+class _TickCtx:
+    """One clock sample shared by everything a single panel refresh renders."""
+    mono: float
+    utc: datetime
+
+
+def _tick_ctx() -> _TickCtx:
+    return _TickCtx(time.monotonic(), datetime.now(timezone.utc))
+
+
 class GuildPlayer:
+    # One per guild, so keep instances dict-free.
+    __slots__ = (
+        "bot", "guild", "queue", "_queue_seqs", "queue_event", "current", "next_event", "_connected",
+        "loop_task", "voice", "ffmpeg_exe", "_stopped",
+        "panel_channel_id", "panel_message_id", "_panel_lock", "_panel_fingerprint", "_panel_embed_cache",
+        "_view", "_view_sent_prev",
+        "_start_time_utc", "_history", "_history_index", "_history_seq_pos", "_history_base",
+        "repeat_mode", "_navigating_history", "_seq_counter",
+        "_ui_task", "_last_panel_bump_monotonic", "_last_cleanup_mono",
+        "_idle_started_mono", "_last_activity_mono", "_idle_handle", "_idle_fire_task",
+    )
+
     def __init__(self, bot: commands.Bot, guild: discord.Guild):
         self.bot = bot
         self.guild = guild
         self.queue: Deque[Track] = deque()
+        self._queue_seqs: Counter[int] = Counter()  # seq -> copies queued; kept in step by the _q_* helpers
         self.queue_event = asyncio.Event()
         self.current: Optional[Track] = None
         self.next_event = asyncio.Event()
+        self._connected = asyncio.Event()  # set once voice is up; playback waits on it
         self.loop_task: Optional[asyncio.Task] = None
         self.voice: Optional[discord.VoiceClient] = None
         self.ffmpeg_exe: str = FFMPEG_EXE
@@ -471,11 +1049,18 @@ class GuildPlayer:
         self.panel_channel_id: Optional[int] = None
         self.panel_message_id: Optional[int] = None
         self._panel_lock: asyncio.Lock = asyncio.Lock()
+        self._panel_fingerprint: tuple = ()  # what the live panel currently shows
+        self._panel_embed_cache: Optional[tuple[tuple, discord.Embed]] = None  # (fingerprint, last render)
+        self._view: Optional[ControlView] = None
+        self._view_sent_prev: Optional[bool] = None  # prev-button state the live panel carries; None = unknown
 
         # Timing + history (bounded)
         self._start_time_utc: Optional[datetime] = None
-        self._history: list[Track] = []
+        self._history: Deque[Track] = deque(maxlen=HISTORY_MAX)
         self._history_index: int = -1  # points into _history; -1 means no history yet
+        # seq -> absolute history position; index into _history is pos - _history_base
+        self._history_seq_pos: dict[int, int] = {}
+        self._history_base: int = 0
         self.repeat_mode: str = "off"   # off | one | all
         self._navigating_history: bool = False
         self._seq_counter: int = 0
@@ -483,48 +1068,27 @@ class GuildPlayer:
         # Live UI updates
         self._ui_task: Optional[asyncio.Task] = None
 
-        # Temp cookies file (when using YTDLP_COOKIES_B64)
-        self._temp_cookie_path: Optional[Path] = None
-
         # Bump tracking
         self._last_panel_bump_monotonic: float = 0.0
+        self._last_cleanup_mono: float = 0.0
         # Idle tracking (voice disconnect after inactivity)
         self._idle_started_mono: Optional[float] = None
         self._last_activity_mono: float = time.monotonic()
-        self._idle_task: Optional[asyncio.Task] = None
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        self._idle_fire_task: Optional[asyncio.Task] = None  # strong ref while the expiry check runs
 
-    # ----- Cookies lifecycle for this player -----
-    def _ensure_temp_cookie_file(self):
-        if self._temp_cookie_path is None and YTDLP_COOKIES_B64:
-            try:
-                self._temp_cookie_path = write_temp_cookie_file_from_b64(YTDLP_COOKIES_B64)
-                log.info("Created temp cookies file %s", self._temp_cookie_path)
-            except Exception:
-                log.exception("Failed to create temp cookies file from YTDLP_COOKIES_B64")
-
-    def _cleanup_temp_cookie_file(self):
-        if self._temp_cookie_path and self._temp_cookie_path.exists():
-            try:
-                self._temp_cookie_path.unlink(missing_ok=True)
-                log.info("Deleted temp cookies file %s", self._temp_cookie_path)
-            except Exception:
-                log.debug("Failed to delete temp cookies file %s", self._temp_cookie_path)
-        self._temp_cookie_path = None
-
-    def ytdl_opts(self) -> Dict[str, Any]:
-        opts = dict(BASE_YTDL_OPTS)
+    def ytdl_opts(self) -> Mapping[str, Any]:
         if YTDLP_COOKIES_B64 and not YTDLP_COOKIES_FROM_BROWSER and not YTDLP_COOKIES_FILE:
-            self._ensure_temp_cookie_file()
-            if self._temp_cookie_path:
-                opts["cookiefile"] = str(self._temp_cookie_path)
-        return opts
+            cookie_path = get_shared_cookie_path()
+            if cookie_path:
+                return ytdl_opts_variant("base", str(cookie_path))
+        return YTDL_OPTS_BASE
 
     # ----- Idle + listeners -----
-    def _has_humans(self) -> bool:
-        if not self.voice or not self.voice.channel:
-            return False
-        members = getattr(self.voice.channel, "members", []) or []
-        return any((not getattr(m, "bot", False)) for m in members)
+    def _has_human_listener(self) -> bool:
+        # any() stops at the first human; we only ever need zero vs. non-zero.
+        ch = self.voice.channel if self.voice else None
+        return bool(ch and any(not getattr(m, "bot", False) for m in getattr(ch, "members", ())))
 
     async def _safe_disconnect(self, reason: str):
         log.info("Disconnecting voice in guild %s: %s", self.guild.id, reason)
@@ -534,8 +1098,9 @@ class GuildPlayer:
         except Exception:
             log.debug("Voice disconnect failed: %s", reason, exc_info=True)
         self.voice = None
+        self._connected.clear()
         self.current = None
-        self.queue.clear()
+        self._q_clear()
         self._idle_started_mono = None
         self._last_activity_mono = time.monotonic()
         if DELETE_PANEL_ON_IDLE:
@@ -546,16 +1111,42 @@ class GuildPlayer:
     def _queue_empty(self) -> bool:
         return len(self.queue) == 0
 
+    # ----- Queue bookkeeping (keeps _queue_seqs in step) -----
+    def _q_append(self, track: Track):
+        self.queue.append(track)
+        self._queue_seqs[track.seq] += 1
+
+    def _q_appendleft(self, track: Track):
+        self.queue.appendleft(track)
+        self._queue_seqs[track.seq] += 1
+
+    def _q_extend(self, tracks):
+        for t in tracks:
+            self._q_append(t)
+
+    def _q_popleft(self) -> Track:
+        track = self.queue.popleft()
+        n = self._queue_seqs[track.seq] - 1
+        if n > 0:
+            self._queue_seqs[track.seq] = n
+        else:
+            del self._queue_seqs[track.seq]
+        return track
+
+    def _q_clear(self):
+        self.queue.clear()
+        self._queue_seqs.clear()
+
     def _cancel_idle_timer(self):
-        if self._idle_task and not self._idle_task.done():
-            self._idle_task.cancel()
-        self._idle_task = None
+        if self._idle_handle:
+            self._idle_handle.cancel()
+        self._idle_handle = None
         self._idle_started_mono = None
 
     async def _start_idle_timer_if_needed(self):
         if not (self.voice and self.voice.is_connected()):
             return
-        if self._has_humans() is False:
+        if not self._has_human_listener():
             self._cancel_idle_timer()
             await self._safe_disconnect("no humans")
             return
@@ -565,30 +1156,32 @@ class GuildPlayer:
         if not self._queue_empty():
             self._cancel_idle_timer()
             return
-        if self._idle_task and not self._idle_task.done():
+        if self._idle_handle:
             return
 
-        async def _idle_wait():
-            self._idle_started_mono = time.monotonic()
-            try:
-                await asyncio.sleep(300)
-                if not (self.voice and self.voice.is_connected()):
-                    return
-                if self.voice.is_playing() or self.voice.is_paused():
-                    return
-                if not self._queue_empty():
-                    return
-                if not self._has_humans():
-                    await self._safe_disconnect("idle timeout (no humans)")
-                    return
-                await self._safe_disconnect("idle timeout (5m)")
-            except asyncio.CancelledError:
-                return
-            finally:
-                self._idle_task = None
-                self._idle_started_mono = None
+        # A bare loop timer: nothing but a handle is kept alive while the guild sits idle.
+        self._idle_started_mono = time.monotonic()
+        self._idle_handle = asyncio.get_running_loop().call_later(300, self._idle_fire_sync)
 
-        self._idle_task = asyncio.create_task(_idle_wait())
+    def _idle_fire_sync(self):
+        self._idle_handle = None
+        self._idle_fire_task = asyncio.create_task(self._idle_fire())
+
+    async def _idle_fire(self):
+        try:
+            if not (self.voice and self.voice.is_connected()):
+                return
+            if self.voice.is_playing() or self.voice.is_paused():
+                return
+            if not self._queue_empty():
+                return
+            if not self._has_human_listener():
+                await self._safe_disconnect("idle timeout (no humans)")
+                return
+            await self._safe_disconnect("idle timeout (5m)")
+        finally:
+            self._idle_started_mono = None
+            self._idle_fire_task = None
 
     async def _on_track_start(self):
         self._cancel_idle_timer()
@@ -612,68 +1205,102 @@ class GuildPlayer:
         if self.voice and self.voice.is_connected():
             if self.voice.channel != channel:
                 await self.voice.move_to(channel)
+            self._connected.set()
             return
         self.voice = await channel.connect(self_deaf=True, timeout=timeout, reconnect=True)
+        self._connected.set()
+
+    async def _wait_for_voice(self, timeout: float) -> bool:
+        # connect() sets _connected; a reconnect inside discord.py doesn't, so re-check the client too.
+        deadline = time.monotonic() + timeout
+        while not (self.voice and self.voice.is_connected()):
+            remaining = deadline - time.monotonic()
+            if self._stopped or remaining <= 0:
+                return False
+            self._connected.clear()
+            try:
+                await asyncio.wait_for(self._connected.wait(), timeout=min(1.0, remaining))
+            except asyncio.TimeoutError:
+                pass
+        return True
+
+    def enqueue_mark(self) -> int:
+        """Sequence number before the next enqueue; pass it to rollback_since() to undo that enqueue."""
+        return self._seq_counter
+
+    async def rollback_since(self, mark: int, requester: Optional[discord.Member]) -> int:
+        """Drop tracks *requester* enqueued after *mark*, skipping one that already started; returns the count."""
+        def ours(t: Track) -> bool:
+            return t.seq > mark and t.requested_by is requester
+
+        kept = [t for t in self.queue if not ours(t)]
+        dropped = len(self.queue) - len(kept)
+        if dropped:
+            self._q_clear()
+            self._q_extend(kept)
+        if self.current and ours(self.current):
+            # Already connected (e.g. a failed move_to): player_loop may have started the first track.
+            self.skip()
+            dropped += 1
+        await self._on_queue_updated()
+        return dropped
 
     async def enqueue(self, query: str, requester: Optional[discord.Member]) -> List[Track]:
-        try:
-            tracks = await create_tracks_from_query(query, ytdl_opts=self.ytdl_opts())
-        except Exception as e:
-            raise RuntimeError(str(e)) from e
-
         good: List[Track] = []
-        for t in tracks:
-            if not t or not t.stream_url:
-                continue
+
+        async def _add(t: Track):
+            # Queue each track as it resolves so playback can start before a big import finishes.
+            if not t or not (t.stream_url or t.webpage_url):
+                return
             self._seq_counter += 1
-            wrapped = Track(
-                seq=self._seq_counter,
-                title=t.title,
-                stream_url=t.stream_url,
-                webpage_url=t.webpage_url,
-                duration=t.duration,
-                thumbnail=t.thumbnail,
-                requested_by=requester,
-            )
-            self.queue.append(wrapped)
+            wrapped = replace(t, seq=self._seq_counter, requested_by=requester)
+            self._q_append(wrapped)
             good.append(wrapped)
+            self.queue_event.set()
+            if len(good) == 1:
+                self.ensure_loop()
+                await self._on_queue_updated()
+
+        try:
+            await create_tracks_from_query(query, ytdl_opts=self.ytdl_opts(), on_track=_add)
+        except Exception as e:
+            if not good:
+                raise RuntimeError(str(e)) from e
+            log.warning("Import of %r stopped after %s track(s): %s", query, len(good), e)
 
         if good:
-            self.queue_event.set()
-            self.ensure_loop()
             self._last_activity_mono = time.monotonic()
             await self._on_queue_updated()
         return good
 
     def _now(self): return datetime.now(timezone.utc)
 
-    def estimated_position(self) -> Optional[int]:
+    def estimated_position(self, ctx: Optional[_TickCtx] = None) -> Optional[int]:
         if not self._start_time_utc or not self.current or not self.current.duration:
             return None
-        return int((self._now() - self._start_time_utc).total_seconds())
+        now = ctx.utc if ctx else self._now()
+        return int((now - self._start_time_utc).total_seconds())
 
-    def _progress_bar(self, width: int = 18) -> Optional[str]:
+    def _progress_bar(self, width: int = _BAR_W, ctx: Optional[_TickCtx] = None) -> Optional[str]:
         if not self.current or not self.current.duration:
             return None
-        pos = self.estimated_position() or 0
+        pos = self.estimated_position(ctx) or 0
         ratio = min(max(pos / float(self.current.duration), 0.0), 1.0)
         filled = int(ratio * width)
-        return f"{'▰'*filled}{'▱'*(width-filled)} {fmt_time(pos)}/{fmt_time(self.current.duration)}"
+        bar = _BAR_TABLE[filled] if width == _BAR_W else "▰" * filled + "▱" * (width - filled)
+        return f"{bar} {fmt_time(pos)}/{fmt_time(self.current.duration)}"
 
     def set_panel_channel(self, channel: discord.abc.Messageable, *, force: bool = False):
         if isinstance(channel, (discord.TextChannel, discord.Thread)):
             if force or self.panel_channel_id is None:
+                ids = panel_channel_ids(self.bot)
+                ids.discard(self.panel_channel_id)
                 self.panel_channel_id = channel.id
+                ids.add(channel.id)
 
     def _alone_in_voice(self) -> bool:
-        if not self.voice or not self.voice.channel:
-            return False
-        members = getattr(self.voice.channel, "members", None)
-        if members is None:
-            return False
         # Consider "alone" if only the bot remains.
-        human_count = sum(1 for m in members if not getattr(m, "bot", False))
-        return human_count == 0
+        return bool(self.voice and self.voice.channel) and not self._has_human_listener()
 
     async def _resolve_panel_channel(self):
         if self.panel_channel_id:
@@ -682,30 +1309,85 @@ class GuildPlayer:
                 return ch
         return None
 
-    async def _cleanup_old_panels(self, ch: discord.abc.Messageable, keep_id: int):
-        """Delete other panel messages from this bot in the same channel to keep a single panel visible."""
+    async def _cleanup_old_panels(self, ch: discord.abc.Messageable, keep_id: int, *, force: bool = False):
+        """
+        Delete other panel messages from this bot in the same channel to keep a single panel visible.
+        Edits only rescan once a minute; a freshly sent panel (force) always does.
+        """
         if not self.bot.user:
             return
+        now_mono = time.monotonic()
+        if not force and now_mono - self._last_cleanup_mono < 60:
+            return
+        self._last_cleanup_mono = now_mono
+        me = self.bot.user.id
+
+        def _is_stale_panel(m: discord.Message) -> bool:
+            if m.author.id != me or m.id == keep_id or not m.embeds:
+                return False
+            author = m.embeds[0].author
+            return bool(author and author.name == "DiscBot Music Console")
+
         try:
-            async for m in ch.history(limit=30):
-                if m.author.id != self.bot.user.id:
-                    continue
-                if m.id == keep_id:
-                    continue
-                if not m.embeds:
-                    continue
-                embed = m.embeds[0]
-                if embed.author and embed.author.name == "DiscBot Music Console":
-                    try:
-                        await m.delete()
-                    except Exception:
-                        continue
-        except Exception as e:
+            # One bulk-delete call; bulk needs Manage Messages, so fall back to per-message deletes of our own posts.
+            try:
+                await ch.purge(limit=30, check=_is_stale_panel, bulk=True)
+            except discord.Forbidden:
+                await ch.purge(limit=30, check=_is_stale_panel, bulk=False)
+        except (discord.Forbidden, discord.HTTPException) as e:
             log.debug("Panel cleanup skipped: %s", e)
 
-    def _panel_embed(self) -> discord.Embed:
-        palette = {"off": 0x5865F2, "one": 0xFEE75C, "all": 0x57F287}
-        mode_badge = {"off": "🚫 Off", "one": "🔂 Single", "all": "🔁 Queue"}
+    def _get_view(self) -> ControlView:
+        """The player's one ControlView, built on first use; button flags reflect current state."""
+        if self._view is None or self._view.is_finished():
+            self._view = ControlView(self.bot, self)
+        else:
+            self._view.update_states()
+        return self._view
+
+    def _queue_head(self) -> tuple[tuple[int, ...], list[str]]:
+        """One pass over the first five queued tracks: their seqs (for the fingerprint) and Up Next lines."""
+        seqs: list[int] = []
+        lines: list[str] = []
+        for idx, track in enumerate(itertools.islice(self.queue, 5)):
+            seqs.append(track.seq)
+            lines.append(f"`{idx+1:02d}` [{track.title}]({track.webpage_url})")
+        return tuple(seqs), lines
+
+    def _panel_state(self, ctx: Optional[_TickCtx] = None, head: Optional[tuple] = None) -> tuple:
+        """Everything the panel renders (minus its timestamp); equal tuples mean an identical panel."""
+        cur = self.current
+        seqs = (head or self._queue_head())[0]
+        return (
+            cur.seq if cur else None,
+            cur.title if cur else None,
+            self.estimated_position(ctx) or 0,
+            len(self.queue),
+            seqs,
+            self.repeat_mode,
+            bool(self.voice and self.voice.is_connected()),
+            bool(self.voice and self.voice.is_playing()),
+            bool(self.voice and self.voice.is_paused()),
+            self.can_go_previous(),
+        )
+
+    def current_panel_embed(self) -> discord.Embed:
+        """The panel as it stands now; reuses the last render while nothing visible has changed."""
+        ctx = _tick_ctx()
+        head = self._queue_head()
+        fp = self._panel_state(ctx, head)
+        cached = self._panel_embed_cache
+        if cached and cached[0] == fp:
+            return cached[1]
+        return self._render_panel(ctx, head, fp)
+
+    def _render_panel(self, ctx: _TickCtx, head: tuple, fp: tuple) -> discord.Embed:
+        embed = self._panel_embed(ctx, head)
+        self._panel_embed_cache = (fp, embed)
+        return embed
+
+    def _panel_embed(self, ctx: Optional[_TickCtx] = None, head: Optional[tuple] = None) -> discord.Embed:
+        ctx = ctx or _tick_ctx()
         is_connected = bool(self.voice and self.voice.is_connected())
         is_playing = bool(self.voice and self.voice.is_playing())
         is_paused = bool(self.voice and self.voice.is_paused())
@@ -725,8 +1407,8 @@ class GuildPlayer:
         embed = discord.Embed(
             title="DiscBot Music Console",
             description=status_line,
-            color=palette.get(self.repeat_mode, 0x5865F2),
-            timestamp=datetime.now(timezone.utc),
+            color=_PALETTE.get(self.repeat_mode, 0x5865F2),
+            timestamp=ctx.utc,
         )
 
         bot_logo = logo_embed_url()
@@ -735,7 +1417,7 @@ class GuildPlayer:
         playback_lines: list[str] = []
         if has_track and self.current:
             playback_lines.append(f"**[{self.current.title}]({self.current.webpage_url})**")
-            prog = self._progress_bar()
+            prog = self._progress_bar(ctx=ctx)
             if prog:
                 playback_lines.append(f"`{prog}`")
             if self.current.requested_by:
@@ -749,14 +1431,13 @@ class GuildPlayer:
 
         queue_len = len(self.queue)
         embed.add_field(name="Queue Depth", value=f"{queue_len} waiting", inline=True)
-        embed.add_field(name="Repeat Mode", value=mode_badge.get(self.repeat_mode, self.repeat_mode), inline=True)
+        embed.add_field(name="Repeat Mode", value=_MODE_BADGE.get(self.repeat_mode, self.repeat_mode), inline=True)
 
-        upcoming = list(itertools.islice(self.queue, 5))
-        if upcoming:
-            lines = [f"`{idx+1:02d}` [{track.title}]({track.webpage_url})" for idx, track in enumerate(upcoming)]
-            if queue_len > len(upcoming):
-                lines.append(f"…and {queue_len - len(upcoming)} more in queue")
-            embed.add_field(name="Up Next", value="\n".join(lines), inline=False)
+        lines = (head or self._queue_head())[1]
+        if lines:
+            extra = queue_len - len(lines)
+            tail = (f"…and {extra} more in queue",) if extra > 0 else ()
+            embed.add_field(name="Up Next", value="\n".join(itertools.chain(lines, tail)), inline=False)
 
         if bot_logo:
             embed.set_thumbnail(url=bot_logo)
@@ -773,38 +1454,62 @@ class GuildPlayer:
         if not ch:
             return
         try:
-            msg = await ch.fetch_message(self.panel_message_id)
-            await msg.delete()
+            await ch.get_partial_message(self.panel_message_id).delete()
         except Exception:
             pass
         finally:
             self.panel_message_id = None
+            self._panel_fingerprint = ()
+            self._view_sent_prev = None
 
-    async def post_or_update_panel(self):
+    async def post_or_update_panel(self, ctx: Optional[_TickCtx] = None):
         ch = await self._resolve_panel_channel()
         if not ch:
             return
-        view = ControlView(self.bot, self)
+        ctx = ctx or _tick_ctx()
+        head = self._queue_head()
+        fp = self._panel_state(ctx, head)
+        if self.panel_message_id and fp == self._panel_fingerprint:
+            return  # nothing visible changed; skip the Discord round-trip (and the lock)
         async with self._panel_lock:
+            # Re-check under the lock: a concurrent update may have landed this state while we waited.
+            head = self._queue_head()
+            fp = self._panel_state(ctx, head)
+            if self.panel_message_id and fp == self._panel_fingerprint:
+                return
+            can_prev = self.can_go_previous()
             if self.panel_message_id:
                 try:
-                    msg = await ch.fetch_message(self.panel_message_id)
-                    await msg.edit(embed=self._panel_embed(), view=view)
+                    # A partial message edits by id; no GET needed first. A stale id surfaces as NotFound.
+                    msg = ch.get_partial_message(self.panel_message_id)
+                    # Buttons only change with the prev state; otherwise leave the components untouched.
+                    view = self._get_view() if can_prev != self._view_sent_prev else discord.utils.MISSING
+                    await msg.edit(embed=self._render_panel(ctx, head, fp), view=view)
+                    self._panel_fingerprint = fp
+                    self._view_sent_prev = can_prev
                     await self._cleanup_old_panels(ch, msg.id)
                     return
                 except (discord.NotFound, discord.Forbidden, discord.HTTPException):
                     self.panel_message_id = None
             try:
-                file = build_logo_file() if logo_requires_attachment() else None
-                msg = await ch.send(embed=self._panel_embed(), view=view, file=file)
+                file = build_logo_file()  # fresh wrapper over the cached bytes; None without a local logo
+                msg = await ch.send(embed=self._render_panel(ctx, head, fp), view=self._get_view(), file=file)
                 self.panel_message_id = msg.id
-                await self._cleanup_old_panels(ch, msg.id)
+                self._panel_fingerprint = fp
+                self._view_sent_prev = can_prev
+                await self._cleanup_old_panels(ch, msg.id, force=True)
             except discord.Forbidden:
                 log.warning("Missing perms to send panel in %s", ch)
             except discord.HTTPException as e:
                 log.debug("Failed to send panel: %s", e)
 
-    async def _bump_panel_if_needed(self, force: bool = False):
+    async def refresh_panel(self, ctx: Optional[_TickCtx] = None):
+        """Edit the panel in place, then bump it below newer chatter if it is due."""
+        ctx = ctx or _tick_ctx()
+        await self.post_or_update_panel(ctx)
+        await self._bump_panel_if_needed(force=False, ctx=ctx)
+
+    async def _bump_panel_if_needed(self, force: bool = False, ctx: Optional[_TickCtx] = None):
         if not self.panel_message_id:
             return
         if PANEL_BUMP_SECONDS <= 0 and not force:
@@ -816,21 +1521,26 @@ class GuildPlayer:
         try:
             last_id = ch.last_message_id
             should_bump = force or (last_id is not None and last_id != self.panel_message_id)
-            now_mono = time.monotonic()
+            ctx = ctx or _tick_ctx()
+            now_mono = ctx.mono
             if not force and (now_mono - self._last_panel_bump_monotonic) < max(PANEL_BUMP_SECONDS, 1):
                 should_bump = False
 
             if should_bump:
                 try:
-                    old = await ch.fetch_message(self.panel_message_id)
-                    await old.delete()
+                    await ch.get_partial_message(self.panel_message_id).delete()
                 except Exception:
                     pass
-                file = build_logo_file() if logo_requires_attachment() else None
-                msg = await ch.send(embed=self._panel_embed(), view=ControlView(self.bot, self), file=file)
+                file = build_logo_file()
+                head = self._queue_head()
+                fp = self._panel_state(ctx, head)
+                can_prev = self.can_go_previous()
+                msg = await ch.send(embed=self._render_panel(ctx, head, fp), view=self._get_view(), file=file)
                 self.panel_message_id = msg.id
+                self._panel_fingerprint = fp
+                self._view_sent_prev = can_prev
                 self._last_panel_bump_monotonic = now_mono
-                await self._cleanup_old_panels(ch, msg.id)
+                await self._cleanup_old_panels(ch, msg.id, force=True)
         except Exception as e:
             log.debug("Panel bump failed: %s", e)
 
@@ -840,47 +1550,16 @@ class GuildPlayer:
         """
         ch_bps = getattr(self.voice.channel, "bitrate", 128000) if self.voice else 128000
 
-        cap_env = os.getenv("MUSIC_OPUS_BITRATE_MAX")
-        cap_kbps = None
-        if cap_env:
-            try:
-                cap_kbps = max(8, min(512, int(cap_env)))
-            except Exception:
-                cap_kbps = None
-
         kbps = ch_bps // 1000
-        if cap_kbps is not None:
-            kbps = min(kbps, cap_kbps)
+        if OPUS_BITRATE_MAX is not None:
+            kbps = min(kbps, OPUS_BITRATE_MAX)
         kbps = max(8, min(512, kbps))
 
-        # Robust network flags; DO NOT throttle with -re
-        before_opts = (
-            "-nostdin "
-            "-rw_timeout 30000000 "
-            "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 "
-            "-probesize 10000000 -analyzeduration 10000000"
-        )
-
-        # Keep timestamps and speed stable; resample deterministically to 48k stereo s16
-        audio_filters = (
-            "aresample=async=1:min_hard_comp=0.1:first_pts=0,"
-            "aresample=48000,"
-            "aformat=sample_fmts=s16:channel_layouts=stereo"
-        )
-
-        opus_quality_opts = (
-            f"-vn -sn -dn -af {audio_filters} "
-            "-application audio "
-            "-vbr on "
-            "-compression_level 10 "
-            "-frame_duration 20"
-        )
-
         return discord.FFmpegOpusAudio(
             self.current.stream_url,
             bitrate=kbps,
-            before_options=before_opts,
-            options=opus_quality_opts,
+            before_options=_FFMPEG_BEFORE_OPTS,
+            options=_FFMPEG_OPUS_OPTS,
             executable=self.ffmpeg_exe,
         )
 
@@ -895,18 +1574,17 @@ class GuildPlayer:
         if track is None:
             return
 
-        existing_idx = next((i for i, t in enumerate(self._history) if t.seq == track.seq), None)
+        pos = self._history_seq_pos.get(track.seq)
 
-        if existing_idx is not None:
-            self._history_index = existing_idx
+        if pos is not None:
+            self._history_index = pos - self._history_base
         else:
-            self._history.append(track)
-            if len(self._history) > 5:
-                overflow = len(self._history) - 5
-                self._history = self._history[overflow:]
-                self._history_index = max(0, len(self._history) - 1)
-            else:
-                self._history_index = len(self._history) - 1
+            if len(self._history) == self._history.maxlen:
+                del self._history_seq_pos[self._history[0].seq]
+                self._history_base += 1
+            self._history.append(track)  # maxlen evicts the oldest entry
+            self._history_index = len(self._history) - 1
+            self._history_seq_pos[track.seq] = self._history_base + self._history_index
 
         log.info(
             "History sync nav=%s idx=%s len=%s seq=%s title=%s queue_len=%s",
@@ -927,17 +1605,17 @@ class GuildPlayer:
         # If we're at the start of history, just restart the current track.
         if self._history_index <= 0:
             if self.current:
-                self.queue.appendleft(self.current)
+                self._q_appendleft(self.current)
                 log.info("History back restart seq=%s queue_len=%s", self.current.seq, len(self.queue))
                 self.skip()
             return
 
         pointer = self._history_index - 1
         target = self._history[pointer]
-        if self.current and not any(t.seq == self.current.seq for t in self.queue):
+        if self.current and self.current.seq not in self._queue_seqs:
             # Keep the current track in the queue so forward navigation can return to it.
-            self.queue.appendleft(self.current)
-        self.queue.appendleft(target)
+            self._q_appendleft(self.current)
+        self._q_appendleft(target)
         old_idx = self._history_index
         self._history_index = pointer
         self._navigating_history = True
@@ -971,7 +1649,7 @@ class GuildPlayer:
             track.seq,
             len(self.queue),
         )
-        self.queue.appendleft(track)
+        self._q_appendleft(track)
         self.skip()
         if self._history_index >= len(self._history) - 1:
             self._history_index = len(self._history) - 1  # stay at live edge index
@@ -979,8 +1657,7 @@ class GuildPlayer:
     async def _ui_updater(self):
         try:
             while self.voice and (self.voice.is_playing() or self.voice.is_paused()):
-                await self.post_or_update_panel()
-                await self._bump_panel_if_needed(force=False)
+                await self.refresh_panel()
                 await asyncio.sleep(max(0.5, PROGRESS_UPDATE_SECONDS))
         except asyncio.CancelledError:
             pass
@@ -991,54 +1668,22 @@ class GuildPlayer:
         self._stopped = False
         while not self._stopped:
             # Disconnect if alone in voice
-            if self.voice and self.voice.is_connected() and not self._has_humans():
+            if self.voice and self.voice.is_connected() and not self._has_human_listener():
                 await self._safe_disconnect("no humans present")
                 continue
 
-            # Idle disconnect tracking (no queue, nothing playing/paused)
-            if (
-                self.voice
-                and self.voice.is_connected()
-                and not self.voice.is_playing()
-                and not self.voice.is_paused()
-                and not self.queue
-            ):
-                now_mono = time.monotonic()
-                if self._idle_started_mono is None:
-                    self._idle_started_mono = now_mono
-                elif (now_mono - self._idle_started_mono) >= 300:
-                    log.info(
-                        "Idle timeout reached; disconnecting voice in guild %s (idle_seconds=%.1f)",
-                        self.guild.id,
-                        now_mono - self._idle_started_mono,
-                    )
-                    try:
-                        await self.voice.disconnect(force=True)
-                    except Exception:
-                        log.debug("Voice disconnect failed during idle timeout", exc_info=True)
-                    self.voice = None
-                    self.current = None
-                    self._idle_started_mono = None
-                    if DELETE_PANEL_ON_IDLE:
-                        await self.delete_panel()
-                    else:
-                        await self.post_or_update_panel()
-                    continue
-            else:
-                self._idle_started_mono = None
-
             if not self.queue:
+                # The idle timer (started from _on_track_end) owns the disconnect decision; just wait for work.
                 self.queue_event.clear()
-                try:
-                    await asyncio.wait_for(self.queue_event.wait(), timeout=30)
-                except asyncio.TimeoutError:
-                    if DELETE_PANEL_ON_IDLE and not self.current:
-                        await self.delete_panel()
-                    continue
-            self.current = self.queue.popleft()
+                await self.queue_event.wait()
+                continue
             if not self.voice or not self.voice.is_connected():
-                self.current = None
+                # Tracks can land before the voice handshake finishes (/play runs both at once); hold them,
+                # but not forever: a voice drop that never recovers falls back to the idle disconnect.
+                if not await self._wait_for_voice(VOICE_WAIT_SECONDS) and not self._stopped:
+                    await self._safe_disconnect("voice unavailable")
                 continue
+            self.current = self._q_popleft()
             self._last_activity_mono = time.monotonic()
 
             # Record history before playback starts so navigation has the right cursor.
@@ -1046,7 +1691,6 @@ class GuildPlayer:
 
             # Reset the completion gate for this track so we don't immediately fast-forward
             self.next_event.clear()
-            self._start_time_utc = datetime.now(timezone.utc)
 
             def after_play(err):
                 if err:
@@ -1055,6 +1699,9 @@ class GuildPlayer:
 
             try:
                 await self._on_track_start()
+                await self.current.resolve(self.ytdl_opts())
+                # Clock starts with the audio; resolve() can take seconds on a cold stream URL.
+                self._start_time_utc = datetime.now(timezone.utc)
                 self.voice.play(self._ffmpeg_source(), after=after_play)
 
                 await self.post_or_update_panel()
@@ -1074,7 +1721,6 @@ class GuildPlayer:
             self._ui_task = None
             self._start_time_utc = None
 
-            self._cleanup_temp_cookie_file()
             self._navigating_history = False
             self._last_activity_mono = time.monotonic()
 
@@ -1094,10 +1740,10 @@ class GuildPlayer:
 
             # ===== Repeat logic =====
             if self.repeat_mode == "one" and self.current:
-                self.queue.appendleft(self.current)
+                self._q_appendleft(self.current)
 
             if not self.queue and self.repeat_mode == "all" and self._history:
-                self.queue.extend(self._history)
+                self._q_extend(self._history)
 
             # ===== Post-track UI =====
             if self.queue:
@@ -1108,10 +1754,7 @@ class GuildPlayer:
             await self._bump_panel_if_needed(force=True)
 
             if MUSIC_LAST_PLAYED_SECONDS > 0:
-                try:
-                    await asyncio.wait_for(asyncio.sleep(MUSIC_LAST_PLAYED_SECONDS), timeout=MUSIC_LAST_PLAYED_SECONDS + 1)
-                except asyncio.TimeoutError:
-                    pass
+                await asyncio.sleep(MUSIC_LAST_PLAYED_SECONDS)
 
             if DELETE_PANEL_ON_IDLE:
                 await self.delete_panel()
@@ -1134,59 +1777,163 @@ class GuildPlayer:
         self._stopped = True
         if self.voice:
             self.voice.stop()
-        self.queue.clear()
+        self._q_clear()
+        # Wake an idle player_loop (waiting on work or on voice) so it sees _stopped and exits
+        self.queue_event.set()
+        self._connected.set()
         asyncio.create_task(self.post_or_update_panel())
-        self._cleanup_temp_cookie_file()
 
     def skip(self):
         if self.voice:
             self.voice.stop()
             asyncio.create_task(self.post_or_update_panel())
 
+    async def cleanup(self):
+        """Tear down everything this player keeps alive; used when the bot leaves the guild."""
+        self._stopped = True
+        self._cancel_idle_timer()
+        for task in (self._ui_task, self.loop_task, self._idle_fire_task):
+            if task and not task.done():
+                task.cancel()
+        if self.voice:
+            try:
+                await self.voice.disconnect(force=True)
+            except Exception:
+                log.debug("Voice disconnect failed during cleanup", exc_info=True)
+        self.voice = None
+        self.current = None
+        self._q_clear()
+        self._history.clear()
+        self._history_seq_pos.clear()
+        panel_channel_ids(self.bot).discard(self.panel_channel_id)
+        if self._view:
+            self._view.stop()
+            self._view = None
+        self._panel_embed_cache = None
+
 
 # =========================
 # Cog
 # =========================
+# Prebuilt error payloads; each failure only copies one and attaches a bounded reason.
+_ERR_JOIN = discord.Embed(title="Couldn’t join voice", color=0xE74C3C)
+_ERR_ENQUEUE = discord.Embed(title="Couldn’t enqueue", color=0xE74C3C)
+_ERR_REASON_MAX = 200
+
+
+def _error_embed(template: discord.Embed, exc: BaseException) -> discord.Embed:
+    reason = str(exc) or type(exc).__name__
+    if len(reason) > _ERR_REASON_MAX:
+        reason = reason[: _ERR_REASON_MAX - 1] + "…"
+    return template.copy().add_field(name="Reason", value=f"`{reason}`", inline=False)
+
+
 class Music(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        if not hasattr(self.bot, "_music_players"):
-            self.bot._music_players = GLOBAL_MUSIC_PLAYERS
-        self.players = self.bot._music_players
-        self.bot.add_view(ControlView(self.bot))
+        # Players outlive cog reloads: the first load parks the shared map on the bot, later loads pick it up.
+        self.players = self.bot.__dict__.setdefault("_music_players", GLOBAL_MUSIC_PLAYERS)
+        self._players_get = self.players.get  # bound once; on_message hits this for every guild message
+        self._panel_channels = panel_channel_ids(bot)
+        # Re-derive from surviving players too, in case they were attached under an older module.
+        self._panel_channels.update(p.panel_channel_id for p in self.players.values() if p.panel_channel_id)
+        self._panel_dirty: dict[int, asyncio.TimerHandle] = {}  # guild id -> pending chat-driven refresh
+        self._panel_tasks: set[asyncio.Task] = set()
+        # One persistent dispatcher for panel buttons; it survives reloads, so only register it once.
+        if getattr(self.bot, "_music_control_view", None) is None:
+            self.bot._music_control_view = ControlView(self.bot)
+            self.bot.add_view(self.bot._music_control_view)
+
+    async def cog_unload(self):
+        for handle in self._panel_dirty.values():
+            handle.cancel()
+        self._panel_dirty.clear()
+        await close_spotify()
 
     def get_player(self, guild: discord.Guild) -> GuildPlayer:
-        p = self.players.get(guild.id)
-        if not p:
-            p = GuildPlayer(self.bot, guild)
-            self.players[guild.id] = p
+        p = self._players_get(guild.id)
+        if p is None:
+            p = self.players[guild.id] = GuildPlayer(self.bot, guild)
         return p
 
+    # --- warm players so the first /play doesn't pay for setup inside the ack window ---
+    @commands.Cog.listener()
+    async def on_ready(self):
+        for g in self.bot.guilds:
+            self.get_player(g)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.get_player(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        # Players are otherwise kept for the process lifetime (they carry panel + repeat settings).
+        handle = self._panel_dirty.pop(guild.id, None)
+        if handle:
+            handle.cancel()
+        p = self.players.pop(guild.id, None)
+        if p:
+            await p.cleanup()
+
     # --- keep panel fresh on channel activity ---
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
+        # Cheapest reject first: almost every message is outside a panel channel.
+        if message.channel.id not in self._panel_channels or message.author.bot or not message.guild:
             return
-        p = self.players.get(message.guild.id)
-        if not p or not p.panel_channel_id or message.channel.id != p.panel_channel_id:
+        p = self._players_get(message.guild.id)
+        if not p or message.channel.id != p.panel_channel_id:
             return
-        await p.post_or_update_panel()
-        await p._bump_panel_if_needed(force=False)
+        self._schedule_panel_refresh(p)
+
+    def _schedule_panel_refresh(self, p: GuildPlayer):
+        # The first message opens a short window; everything until it fires shares one refresh.
+        # (Not reset per message, so steady chatter can't starve the panel.)
+        gid = p.guild.id
+        if gid in self._panel_dirty:
+            return
+        self._panel_dirty[gid] = asyncio.get_running_loop().call_later(
+            PANEL_DEBOUNCE_SECONDS, self._fire_panel_refresh, gid, p
+        )
+
+    def _fire_panel_refresh(self, gid: int, p: GuildPlayer):
+        self._panel_dirty.pop(gid, None)
+        task = asyncio.create_task(p.refresh_panel())
+        self._panel_tasks.add(task)
+        task.add_done_callback(self._panel_tasks.discard)
 
     # ---------- Slash Commands ----------
     @app_commands.command(name="play", description="Play from YouTube or Spotify link/search")
     async def slash_play(self, inter: discord.Interaction, query: str):
-        if not inter.response.is_done():
-            await inter.response.defer(ephemeral=True)
+        # Ack before anything else: connect + extraction can blow well past the 3s window.
+        await inter.response.defer(ephemeral=True)
         if not inter.guild or not inter.user.voice or not inter.user.voice.channel:
             return await inter.followup.send("Join a voice channel first.", ephemeral=True)
+        query = query.strip()
+        if not is_playable_query(query):
+            return await inter.followup.send(
+                "That doesn’t look like a search or a YouTube/Spotify link.", ephemeral=True
+            )
         p = self.get_player(inter.guild)
-        await p.connect(inter.user.voice.channel)
         p.set_panel_channel(inter.channel, force=True)
+        # Voice handshake and track lookup are independent; playback waits for the connection.
+        mark = p.enqueue_mark()
+        enqueue_task = asyncio.create_task(p.enqueue(query, requester=inter.user))  # type: ignore
         try:
-            tracks = await p.enqueue(query, requester=inter.user)  # type: ignore
+            await p.connect(inter.user.voice.channel)
         except Exception as e:
-            return await inter.followup.send(f"Couldn’t enqueue: `{e}`", ephemeral=True)
+            # No voice, no playback: stop the lookup and take back whatever it already queued.
+            enqueue_task.cancel()
+            await asyncio.gather(enqueue_task, return_exceptions=True)
+            await p.rollback_since(mark, inter.user)
+            log.warning("Voice connect failed in guild %s", inter.guild.id, exc_info=e)
+            return await inter.followup.send(embed=_error_embed(_ERR_JOIN, e), ephemeral=True)
+        try:
+            tracks = await enqueue_task
+        except Exception as e:
+            log.warning("Enqueue failed for %r in guild %s", query, inter.guild.id, exc_info=e)
+            return await inter.followup.send(embed=_error_embed(_ERR_ENQUEUE, e), ephemeral=True)
 
         if not tracks:
             return await inter.followup.send("No playable formats were found for that input.", ephemeral=True)
@@ -1194,30 +1941,31 @@ class Music(commands.Cog):
 
     @app_commands.command(name="nowplaying", description="Show the current/last track panel")
     async def slash_nowplaying(self, inter: discord.Interaction):
+        await inter.response.defer(ephemeral=True)
         if not inter.guild:
-            return
+            return await inter.followup.send("Now playing only works in servers.", ephemeral=True)
         p = self.get_player(inter.guild)
-        await inter.response.send_message(embed=p._panel_embed(), ephemeral=True)
+        await inter.followup.send(embed=p.current_panel_embed(), ephemeral=True)
 
     @app_commands.command(name="repeat", description="Configure repeat mode with quick-select buttons")
     @app_commands.describe(mode="Optional quick set: off, one, or all")
-    async def slash_repeat(self, inter: discord.Interaction, mode: Optional[str] = None):
+    @app_commands.choices(mode=[app_commands.Choice(name=m, value=m) for m in ("off", "one", "all")])
+    async def slash_repeat(self, inter: discord.Interaction, mode: Optional[app_commands.Choice[str]] = None):
+        await inter.response.defer(ephemeral=True)
         if not inter.guild:
-            return await inter.response.send_message("Repeat controls only work in servers.", ephemeral=True)
+            return await inter.followup.send("Repeat controls only work in servers.", ephemeral=True)
         p = self.get_player(inter.guild)
-        valid = {"off", "one", "all"}
         if mode:
-            if mode not in valid:
-                return await inter.response.send_message("Valid modes: off, one, all", ephemeral=True)
-            p.repeat_mode = mode
-            await inter.response.send_message(f"Repeat mode set to **{mode}**", ephemeral=True)
+            # Discord only offers the three choices, so the value needs no validation here.
+            p.repeat_mode = mode.value
+            await inter.followup.send(f"Repeat mode set to **{mode.value}**", ephemeral=True)
             await p.post_or_update_panel()
             return
 
         view = RepeatModeView(self, inter.guild, p.repeat_mode)
-        await inter.response.send_message(
-            "Select a repeat mode below to re-arm the deck.", view=view, ephemeral=True
-        )
+        # The first followup after a defer becomes the original response, so bind() can still edit it.
+        await inter.followup.send("Select a repeat mode below to re-arm the deck.", view=view, ephemeral=True)
+        view.bind(inter)
 
     panel = app_commands.Group(name="panel", description="Music panel controls")
 
@@ -1227,15 +1975,15 @@ class Music(commands.Cog):
             return await inter.response.send_message("Run this in a text channel.", ephemeral=True)
         p = self.get_player(inter.guild)
         p.set_panel_channel(inter.channel, force=True)
-        await p.post_or_update_panel()
-        await inter.response.send_message("✅ Panel attached here.", ephemeral=True)
+        # set_panel_channel only records the id; post the panel and answer the command side by side.
+        await asyncio.gather(
+            p.post_or_update_panel(),
+            inter.response.send_message("✅ Panel attached here.", ephemeral=True),
+        )
 
 async def setup(bot: commands.Bot):
     cog = Music(bot)
     await bot.add_cog(cog)
-    if not any(cmd.name == "panel" for cmd in bot.tree.get_commands()):
+    if bot.tree.get_command("panel") is None:
         bot.tree.add_command(cog.panel)
-    try:
-        await bot.tree.sync()
-    except Exception as e:
-        log.debug("App command sync failed: %s", e)
+    # No sync here: main syncs once after every extension has loaded (and only if the tree changed).
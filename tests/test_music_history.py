@@ -0,0 +1,34 @@
+import pytest
+
+for _mod in ("discord", "yt_dlp", "aiohttp", "orjson", "redis"):
+    pytest.importorskip(_mod)
+
+import music  # noqa: E402
+
+
+def _player() -> music.GuildPlayer:
+    return music.GuildPlayer(bot=None, guild=None)  # history bookkeeping touches neither
+
+
+def test_history_past_maxlen_returns_to_newest_entry():
+    p = _player()
+    tracks = [music.Track(seq=i, title=f"t{i}") for i in range(1, music.HISTORY_MAX + 2)]
+    for t in tracks:
+        p._update_history_for_track(t)
+
+    newest = tracks[-1]
+    assert p._history[p._history_index] is newest
+
+    # Step back, then replay the newest track: the cursor must land on it again.
+    p._update_history_for_track(tracks[-2])
+    p._update_history_for_track(newest)
+    assert p._history_index == len(p._history) - 1
+    assert p._history[p._history_index] is newest
+
+
+def test_history_positions_match_scan_after_evictions():
+    p = _player()
+    for i in range(1, 3 * music.HISTORY_MAX):
+        p._update_history_for_track(music.Track(seq=i))
+    for idx, t in enumerate(p._history):
+        assert p._history_seq_pos[t.seq] - p._history_base == idx